@@ -0,0 +1,94 @@
+"""
+SQL helpers for the job_ads partitioning migrations.
+
+A frozen copy of the helpers in app.services.job_ad_partition_service:
+revisions import these instead of the service so that changing the
+service later never changes what an old revision does. Only add to this
+module; a revision that needs different behaviour gets a new helper.
+"""
+import time
+from datetime import date
+
+import sqlalchemy as sa
+
+PARENT_TABLE = "job_ads"
+# Attempts at taking the locks DROP INDEX needs, lock_timeout apart
+DROP_ATTEMPTS = 10
+
+
+def add_months(value: date, months: int) -> date:
+    month = value.month - 1 + months
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def ensure_partitions(conn, start: date, months_ahead: int):
+    """
+    Create the monthly partitions from `start` up to months_ahead months
+    from now, on a table that has no rows outside them yet
+    """
+    month = date(start.year, start.month, 1)
+    last = add_months(date.today(), months_ahead)
+    while month <= last:
+        conn.execute(sa.text(
+            f"CREATE TABLE IF NOT EXISTS {PARENT_TABLE}_y{month.year:04d}m{month.month:02d} "
+            f"PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        month = add_months(month, 1)
+
+
+def list_partitions(conn):
+    rows = conn.execute(sa.text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :parent ORDER BY child.relname"
+    ), {"parent": PARENT_TABLE})
+    return [row[0] for row in rows]
+
+
+def create_partitioned_index(conn, name, columns, using=None, include=None):
+    """
+    Parent index ON ONLY, then each partition indexed CONCURRENTLY and
+    attached. `conn` must be in autocommit mode.
+    """
+    method = f" USING {using}" if using else ""
+    covering = f" INCLUDE ({include})" if include else ""
+    conn.execute(sa.text(
+        f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {PARENT_TABLE}{method} ({columns}){covering}"
+    ))
+    for partition in list_partitions(conn):
+        child = f"{partition}_{name}"[:63]
+        conn.execute(sa.text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition}{method} ({columns}){covering}"
+        ))
+        attached = conn.execute(sa.text(
+            "SELECT 1 FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent AND child.relname = :child"
+        ), {"parent": name, "child": child}).first()
+        if not attached:
+            conn.execute(sa.text(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
+
+
+def drop_partitioned_index(conn, name):
+    """
+    Drop a partitioned index with the partition indexes attached to it.
+
+    That needs a brief ACCESS EXCLUSIVE lock on every partition, so it
+    doesn't queue behind long queries but gives up after lock_timeout and
+    retries. `conn` must be in autocommit mode.
+    """
+    conn.execute(sa.text("SET lock_timeout = '5s'"))
+    try:
+        for attempt in range(DROP_ATTEMPTS):
+            try:
+                conn.execute(sa.text(f"DROP INDEX IF EXISTS {name}"))
+                return
+            except sa.exc.OperationalError:
+                if attempt == DROP_ATTEMPTS - 1:
+                    raise
+                time.sleep(1)
+    finally:
+        conn.execute(sa.text("RESET lock_timeout"))
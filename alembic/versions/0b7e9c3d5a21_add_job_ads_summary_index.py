@@ -0,0 +1,38 @@
+"""Add covering index for job ad list views
+
+Revision ID: 0b7e9c3d5a21
+Revises: f13c5a8e2d94
+Create Date: 2026-10-19 17:12:44.905316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from partition_helpers import create_partitioned_index, drop_partitioned_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7e9c3d5a21'
+down_revision = 'f13c5a8e2d94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Newest-first listings read the summary columns straight from the index
+    # (index-only scans merged across partitions), never touching descriptions
+    with op.get_context().autocommit_block():
+        create_partitioned_index(
+            op.get_bind(),
+            'ix_job_ads_date_posted_summary',
+            'date_posted DESC',
+            include='id, title, company, location',
+        )
+        # Same key as the new index, which serves everything it did
+        drop_partitioned_index(op.get_bind(), 'ix_job_ads_date_posted')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        create_partitioned_index(op.get_bind(), 'ix_job_ads_date_posted', 'date_posted DESC')
+        drop_partitioned_index(op.get_bind(), 'ix_job_ads_date_posted_summary')
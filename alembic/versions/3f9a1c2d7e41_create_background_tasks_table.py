@@ -0,0 +1,45 @@
+"""Create background tasks table
+
+Revision ID: 3f9a1c2d7e41
+Revises: b069ec77370d
+Create Date: 2026-10-19 09:12:44.218305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c2d7e41'
+down_revision = 'b069ec77370d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('background_tasks',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('queue', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('locked_by', sa.String(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_background_tasks_ready', 'background_tasks', ['queue', sa.text('priority DESC'), 'run_at'], unique=False, postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('ix_background_tasks_status', 'background_tasks', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_background_tasks_status', table_name='background_tasks')
+    op.drop_index('ix_background_tasks_ready', table_name='background_tasks', postgresql_where=sa.text("status = 'queued'"))
+    op.drop_table('background_tasks')
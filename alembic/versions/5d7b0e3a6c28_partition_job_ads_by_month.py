@@ -0,0 +1,85 @@
+"""Partition job_ads by month of date_posted
+
+Revision ID: 5d7b0e3a6c28
+Revises: 8c4e2b7a9d13
+Create Date: 2026-10-19 11:26:05.771402
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+from partition_helpers import ensure_partitions, create_partitioned_index
+
+
+# revision identifiers, used by Alembic.
+revision = '5d7b0e3a6c28'
+down_revision = '8c4e2b7a9d13'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, title, company, location, description, job_url, category, date_posted, keywords"
+PARTITIONS_AHEAD = 3
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    existing = sa.inspect(conn).has_table('job_ads')
+    if existing:
+        # Tables created with create_all() before this migration existed
+        op.execute("ALTER TABLE job_ads RENAME TO job_ads_unpartitioned")
+        op.execute("ALTER INDEX job_ads_pkey RENAME TO job_ads_unpartitioned_pkey")
+
+    op.execute("""
+        CREATE TABLE job_ads (
+            id UUID NOT NULL,
+            title VARCHAR NOT NULL,
+            company VARCHAR NOT NULL,
+            location VARCHAR NOT NULL,
+            description VARCHAR,
+            job_url VARCHAR,
+            category VARCHAR,
+            date_posted TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+            keywords VARCHAR,
+            PRIMARY KEY (id, date_posted)
+        ) PARTITION BY RANGE (date_posted)
+    """)
+    # Catches rows outside the monthly partitions (e.g. very old imports)
+    op.execute("CREATE TABLE job_ads_default PARTITION OF job_ads DEFAULT")
+
+    start = None
+    if existing:
+        start = conn.execute(sa.text("SELECT min(date_posted) FROM job_ads_unpartitioned")).scalar()
+    ensure_partitions(conn, start=start.date() if start else date.today(), months_ahead=PARTITIONS_AHEAD)
+
+    if existing:
+        op.execute(f"""
+            INSERT INTO job_ads ({COLUMNS})
+            SELECT id, title, company, location, description, job_url, category,
+                   COALESCE(date_posted, now()), keywords
+            FROM job_ads_unpartitioned
+        """)
+        op.execute("DROP TABLE job_ads_unpartitioned")
+
+    with op.get_context().autocommit_block():
+        create_partitioned_index(conn, 'ix_job_ads_date_posted', 'date_posted DESC')
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE job_ads RENAME TO job_ads_partitioned")
+    op.execute("""
+        CREATE TABLE job_ads (
+            id UUID NOT NULL PRIMARY KEY,
+            title VARCHAR NOT NULL,
+            company VARCHAR NOT NULL,
+            location VARCHAR NOT NULL,
+            description VARCHAR,
+            job_url VARCHAR,
+            category VARCHAR,
+            date_posted TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            keywords VARCHAR
+        )
+    """)
+    op.execute(f"INSERT INTO job_ads ({COLUMNS}) SELECT {COLUMNS} FROM job_ads_partitioned")
+    op.execute("DROP TABLE job_ads_partitioned CASCADE")
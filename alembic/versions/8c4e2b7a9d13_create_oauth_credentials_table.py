@@ -0,0 +1,39 @@
+"""Create oauth credentials table
+
+Revision ID: 8c4e2b7a9d13
+Revises: 3f9a1c2d7e41
+Create Date: 2026-10-19 10:03:17.542981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e2b7a9d13'
+down_revision = '3f9a1c2d7e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('oauth_credentials',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('provider', sa.String(), nullable=False),
+    sa.Column('encrypted_refresh_token', sa.Text(), nullable=True),
+    sa.Column('encrypted_access_token', sa.Text(), nullable=True),
+    sa.Column('access_token_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('scopes', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'provider')
+    )
+    op.create_index(op.f('ix_oauth_credentials_access_token_expires_at'), 'oauth_credentials', ['access_token_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_oauth_credentials_access_token_expires_at'), table_name='oauth_credentials')
+    op.drop_table('oauth_credentials')
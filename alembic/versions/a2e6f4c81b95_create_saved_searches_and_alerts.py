@@ -0,0 +1,53 @@
+"""Create saved searches and search alerts tables
+
+Revision ID: a2e6f4c81b95
+Revises: 5d7b0e3a6c28
+Create Date: 2026-10-19 12:48:31.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2e6f4c81b95'
+down_revision = '5d7b0e3a6c28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('saved_searches',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('query', sa.String(), nullable=True),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('company', sa.String(), nullable=True),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_saved_searches_user_id'), 'saved_searches', ['user_id'], unique=False)
+    op.create_table('search_alerts',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('saved_search_id', sa.UUID(), nullable=False),
+    sa.Column('job_ad_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['saved_search_id'], ['saved_searches.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('saved_search_id', 'job_ad_id')
+    )
+    # Pending alerts per user
+    op.create_index('ix_search_alerts_pending', 'search_alerts', ['user_id', 'created_at'], unique=False, postgresql_where=sa.text('delivered_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_search_alerts_pending', table_name='search_alerts', postgresql_where=sa.text('delivered_at IS NULL'))
+    op.drop_table('search_alerts')
+    op.drop_index(op.f('ix_saved_searches_user_id'), table_name='saved_searches')
+    op.drop_table('saved_searches')
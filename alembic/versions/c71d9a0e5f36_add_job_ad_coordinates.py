@@ -0,0 +1,39 @@
+"""Add coordinates and geohash to job_ads
+
+Revision ID: c71d9a0e5f36
+Revises: a2e6f4c81b95
+Create Date: 2026-10-19 14:02:56.310487
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from partition_helpers import create_partitioned_index, drop_partitioned_index
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71d9a0e5f36'
+down_revision = 'a2e6f4c81b95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable columns without defaults: metadata-only, no table rewrite
+    op.add_column('job_ads', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('job_ads', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('job_ads', sa.Column('geohash', sa.String(length=12), nullable=True))
+
+    # varchar_pattern_ops so geohash prefix (LIKE 'abc%') scans can use the index
+    with op.get_context().autocommit_block():
+        create_partitioned_index(op.get_bind(), 'ix_job_ads_geohash', 'geohash varchar_pattern_ops')
+
+    # Existing ads are geocoded with `python manage.py geocode-job-ads`
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_partitioned_index(op.get_bind(), 'ix_job_ads_geohash')
+    op.drop_column('job_ads', 'geohash')
+    op.drop_column('job_ads', 'longitude')
+    op.drop_column('job_ads', 'latitude')
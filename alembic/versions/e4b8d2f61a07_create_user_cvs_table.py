@@ -0,0 +1,42 @@
+"""Create user_cvs table
+
+Revision ID: e4b8d2f61a07
+Revises: c71d9a0e5f36
+Create Date: 2026-10-19 15:21:08.742193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8d2f61a07'
+down_revision = 'c71d9a0e5f36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_cvs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=False),
+    sa.Column('content_type', sa.String(), nullable=True),
+    sa.Column('storage_path', sa.String(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=True),
+    sa.Column('skills', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_cvs_sha256'), 'user_cvs', ['sha256'], unique=False)
+    op.create_index(op.f('ix_user_cvs_user_id'), 'user_cvs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_cvs_user_id'), table_name='user_cvs')
+    op.drop_index(op.f('ix_user_cvs_sha256'), table_name='user_cvs')
+    op.drop_table('user_cvs')
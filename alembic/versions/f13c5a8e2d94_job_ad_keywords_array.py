@@ -0,0 +1,92 @@
+"""Store job ad keywords as a text array with a GIN index
+
+Revision ID: f13c5a8e2d94
+Revises: e4b8d2f61a07
+Create Date: 2026-10-19 16:05:37.118240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from partition_helpers import create_partitioned_index, drop_partitioned_index
+
+
+# revision identifiers, used by Alembic.
+revision = 'f13c5a8e2d94'
+down_revision = 'e4b8d2f61a07'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+TO_ARRAY = r"regexp_split_to_array(nullif(trim({column}), ''), '\s*,\s*')"
+TO_STRING = "array_to_string({column}, ',')"
+
+
+def convert_keywords(new_type, conversion):
+    """
+    Change the type of job_ads.keywords without rewriting the partitions
+    under an ACCESS EXCLUSIVE lock (which ALTER COLUMN ... TYPE does).
+
+    A new column is added (metadata-only) and kept in sync with a trigger,
+    existing rows are copied over in short batches, then the columns are
+    swapped with renames and the old one dropped, all metadata-only.
+    """
+    conn = op.get_bind()
+    op.execute(f"ALTER TABLE job_ads ADD COLUMN keywords_new {new_type}")
+    op.execute(f"""
+        CREATE FUNCTION job_ads_sync_keywords() RETURNS trigger AS $$
+        BEGIN
+            NEW.keywords_new := {conversion.format(column='NEW.keywords')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        "CREATE TRIGGER job_ads_sync_keywords BEFORE INSERT OR UPDATE OF keywords ON job_ads "
+        "FOR EACH ROW EXECUTE FUNCTION job_ads_sync_keywords()"
+    )
+
+    # Keyset batches over the primary key, each committed on its own, so
+    # only the rows of one batch are locked at a time
+    with op.get_context().autocommit_block():
+        last = None
+        while True:
+            after = "WHERE (id, date_posted) > (:id, :date_posted)" if last else ""
+            last = conn.execute(sa.text(f"""
+                WITH batch AS (
+                    SELECT id, date_posted FROM job_ads {after}
+                    ORDER BY id, date_posted LIMIT :limit
+                ), updated AS (
+                    UPDATE job_ads SET keywords_new = {conversion.format(column='job_ads.keywords')}
+                    FROM batch
+                    WHERE job_ads.id = batch.id AND job_ads.date_posted = batch.date_posted
+                      AND job_ads.keywords IS NOT NULL
+                )
+                SELECT id, date_posted FROM batch ORDER BY id DESC, date_posted DESC LIMIT 1
+            """), {"limit": BATCH_SIZE, **(last or {})}).mappings().first()
+            if last is None:
+                break
+            last = dict(last)
+
+    op.execute("DROP TRIGGER job_ads_sync_keywords ON job_ads")
+    op.execute("DROP FUNCTION job_ads_sync_keywords()")
+    op.execute("ALTER TABLE job_ads RENAME COLUMN keywords TO keywords_old")
+    op.execute("ALTER TABLE job_ads RENAME COLUMN keywords_new TO keywords")
+    op.execute("ALTER TABLE job_ads DROP COLUMN keywords_old")
+
+
+def upgrade() -> None:
+    # Existing comma-separated values become arrays
+    convert_keywords("VARCHAR[]", TO_ARRAY)
+
+    # Lets keyword filters (keywords @> ARRAY[...]) use an index
+    with op.get_context().autocommit_block():
+        create_partitioned_index(op.get_bind(), 'ix_job_ads_keywords', 'keywords', using='gin')
+
+    # Keywords of existing ads are extracted with `python manage.py extract-keywords`
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_partitioned_index(op.get_bind(), 'ix_job_ads_keywords')
+    convert_keywords("VARCHAR", TO_STRING)
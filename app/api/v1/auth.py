@@ -18,6 +18,7 @@ from app.services.user_service import (
     get_user_by_google_id,
     create_user,
 )
+from app.services.token_vault_service import store_google_credentials
 from app.schemas.user import UserCreate
 
 # Allow OAuth over HTTP in development
@@ -25,6 +26,10 @@ os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
 
 router = APIRouter()
 
+# Set while the user is sent back to Google to grant offline access again,
+# so a consent that still yields no refresh token doesn't loop
+CONSENT_COOKIE = "google_consent_requested"
+
 # Google OAuth scopes
 SCOPES = [
     "openid",
@@ -55,15 +60,20 @@ def create_flow():
 
 
 @router.get("/google")
-async def login_google():
+async def login_google(consent: bool = False):
     """
-    Redirect to Google OAuth login
+    Redirect to Google OAuth login.
+
+    With consent=true Google shows the consent screen again, which is the
+    only way to get a new refresh token for a user who already consented.
     """
     try:
         flow = create_flow()
+        options = {"prompt": "consent"} if consent else {}
         authorization_url, state = flow.authorization_url(
             access_type="offline",
             include_granted_scopes="true",
+            **options,
         )
         return RedirectResponse(url=authorization_url)
 
@@ -108,6 +118,24 @@ async def google_callback(request: Request, response: Response, db: Session = De
             )
             user = create_user(db, user_in)
 
+        # Keep the Google credentials (incl. the offline refresh token) for Gmail access
+        credential = store_google_credentials(db, user.id, credentials)
+
+        # Google only sends a refresh token on first consent; users who
+        # consented before tokens were stored have to consent once more
+        if credential.encrypted_refresh_token is None and not request.cookies.get(CONSENT_COOKIE):
+            consent_response = RedirectResponse(url="/api/v1/auth/google?consent=true")
+            consent_response.set_cookie(
+                key=CONSENT_COOKIE,
+                value="1",
+                httponly=True,
+                max_age=600,
+                samesite="lax",
+                secure=settings.COOKIE_SECURE,
+                path="/",
+            )
+            return consent_response
+
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         token = create_access_token(user.id, expires_delta=access_token_expires)
@@ -125,6 +153,7 @@ async def google_callback(request: Request, response: Response, db: Session = De
             secure=settings.COOKIE_SECURE,
             path="/",
         )
+        redirect_response.delete_cookie(key=CONSENT_COOKIE, path="/")
 
         return redirect_response
 
@@ -1,16 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from fastapi.responses import HTMLResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from app.core.db import get_db
+from typing import List, Optional
+from app.core.db import get_db, get_read_db, read_session_factory
 from app.core.auth import get_current_user
 from app.models.user import User
-from app.schemas.job_ad import JobAdBase, JobAdCreate, JobAdUpdate
-from app.services.job_registry_service import create_job_ad as create_job_ad_service
+from app.schemas.job_ad import JobAdBase, JobAdCreate, JobAdUpdate, JobAdNearby, JobAdSummary
+from app.services.job_registry_service import (
+    create_job_ad as create_job_ad_service,
+    get_all_job_ads as get_all_job_ads_service,
+    job_ad_reads,
+)
+from app.services.geo_service import find_job_ads_near, nearby_reads, resolve_location
+from app.services.job_ad_write_buffer import job_ad_writer
+from app.services.job_feed_service import job_ad_events
 
 router = APIRouter()
 
 
+async def save_job_ad(request: Request, db: Session, job_ad: JobAdCreate):
+    """
+    Create an ad directly, or through the per-worker group commit buffer
+    when it is enabled. Either way it is committed when this returns.
+    """
+    if not job_ad_writer.running:
+        return create_job_ad_service(db=db, job_ad=job_ad)
+    created = await job_ad_writer.submit(job_ad)
+    # The buffer writes on its own session; keep read-your-writes working
+    request.state.db_wrote = True
+    return created
+
+
 @router.post("/create_job_ad", response_model=JobAdCreate)
 async def create_job_ad(
     request: Request,
@@ -27,7 +47,7 @@ async def create_job_ad(
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return create_job_ad_service(db=db, job_ad=job_ad)
+    return await save_job_ad(request, db, job_ad)
 
 
 @router.put("/update_job_ad/{job_ad_id}", response_model=JobAdUpdate)
@@ -73,7 +93,7 @@ async def delete_job_ad(
 async def get_job_ad(
     request: Request,
     job_ad_id: int, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -88,14 +108,18 @@ async def get_job_ad(
     pass
 
 
-@router.get("/get_all_job_ads", response_model=List[JobAdBase])
+@router.get("/get_all_job_ads", response_model=List[JobAdSummary])
 async def get_all_job_ads(
     request: Request,
-    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, gt=0, le=500),
+    company: Optional[str] = None,
+    category: Optional[str] = None,
+    keyword: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all job advertisements
+    Get all job advertisements, most recent first
     """
     if current_user is None:
         raise HTTPException(
@@ -103,7 +127,99 @@ async def get_all_job_ads(
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    pass
+    # Concurrent identical requests share one query on their own session
+    route, open_session = read_session_factory(request)
+    return await get_all_job_ads_service(
+        open_session,
+        route,
+        skip=skip,
+        limit=limit,
+        company=company,
+        category=category,
+        keyword=keyword,
+    )
+
+
+@router.get("/read_stats")
+async def read_stats(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Request coalescing counters of this worker
+    """
+    if current_user is None or not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    return [job_ad_reads.stats(), nearby_reads.stats()]
+
+
+@router.get("/search_nearby", response_model=List[JobAdNearby])
+async def search_nearby(
+    request: Request,
+    radius_km: float = Query(30, gt=0, le=1000),
+    location: Optional[str] = None,
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    company: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = Query(100, gt=0, le=500),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Find job advertisements within a radius of a place or coordinates
+    """
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if latitude is None or longitude is None:
+        place = resolve_location(location)
+        if place is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unknown location; pass a known place or latitude and longitude",
+            )
+        latitude, longitude = place.latitude, place.longitude
+
+    route, open_session = read_session_factory(request)
+    return await find_job_ads_near(
+        open_session,
+        route,
+        latitude,
+        longitude,
+        radius_km,
+        company=company,
+        category=category,
+        limit=limit,
+    )
+
+
+@router.get("/stream")
+async def stream_job_ads(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-sent events with a rendered table row for each new job advertisement
+    """
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return StreamingResponse(
+        job_ad_events(request),
+        media_type="text/event-stream",
+        # Stop proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/create_form")
@@ -140,7 +256,7 @@ async def create_job_ad_form(
             application_deadline=form_data.get("application_deadline"),
         )
         
-        create_job_ad_service(db=db, job_ad=job_ad)
+        await save_job_ad(request, db, job_ad)
         
         return HTMLResponse(content="""
         <div class="alert alert-success">
@@ -0,0 +1,107 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.core.db import get_db, get_read_db
+from app.core.auth import get_current_user
+from app.models.user import User
+from app.schemas.saved_search import SavedSearch, SavedSearchCreate, SearchAlert, SearchAlertAck
+from app.services.saved_search_service import (
+    InvalidSavedSearch,
+    acknowledge_alerts,
+    create_saved_search,
+    delete_saved_search,
+    get_pending_alerts,
+    get_saved_searches,
+)
+
+router = APIRouter()
+
+
+def require_user(current_user: User):
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/", response_model=List[SavedSearch])
+async def read_saved_searches(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    List the current user's saved searches
+    """
+    require_user(current_user)
+    return get_saved_searches(db, current_user.id)
+
+
+@router.post("/", response_model=SavedSearch, status_code=status.HTTP_201_CREATED)
+async def create_new_saved_search(
+    request: Request,
+    saved_search_in: SavedSearchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Save a search; new matching job ads create alerts
+    """
+    require_user(current_user)
+    try:
+        return create_saved_search(db, current_user.id, saved_search_in)
+    except InvalidSavedSearch as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+
+@router.delete("/{search_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_existing_saved_search(
+    request: Request,
+    search_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Delete a saved search
+    """
+    require_user(current_user)
+    if not delete_saved_search(db, current_user.id, search_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Saved search not found",
+        )
+
+
+@router.get("/alerts", response_model=List[SearchAlert])
+async def read_alerts(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    List the current user's pending search alerts; they stay pending until
+    acknowledged
+    """
+    require_user(current_user)
+    return get_pending_alerts(db, current_user.id)
+
+
+@router.post("/alerts/ack", response_model=List[SearchAlert])
+async def acknowledge_delivered_alerts(
+    request: Request,
+    ack: SearchAlertAck,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Mark alerts as delivered; returns the alerts that were still pending
+    """
+    require_user(current_user)
+    return acknowledge_alerts(db, current_user.id, ack.alert_ids)
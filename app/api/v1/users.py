@@ -3,9 +3,16 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from uuid import UUID
 
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.core.auth import get_current_user
+from app.schemas.cv import CV
 from app.schemas.user import User, UserUpdate
+from app.services.cv_service import (
+    UploadError,
+    get_user_cvs,
+    save_cv,
+    stream_upload_to_disk,
+)
 from app.services.user_service import (
     get_user_by_id,
     get_users,
@@ -35,7 +42,7 @@ async def read_users(
     request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -78,3 +85,47 @@ async def update_existing_user(
     
     user = update_user(db, user, user_in)
     return user
+
+@router.post("/me/cv", response_model=CV, status_code=status.HTTP_201_CREATED)
+async def upload_cv(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Upload a CV (multipart field "file"). The body is streamed to disk and
+    parsed in a separate process.
+    """
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    try:
+        upload = await stream_upload_to_disk(request)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    try:
+        return await save_cv(db, current_user.id, upload)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+@router.get("/me/cv", response_model=List[CV])
+async def read_my_cvs(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    List the current user's CVs, newest first.
+    """
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return get_user_cvs(db, current_user.id)
@@ -8,9 +8,8 @@ import logging
 from typing import Optional
 
 from .config import settings
-from .db import get_db
 from .security import ALGORITHM, decode_access_token
-from app.services.user_service import get_user_by_id
+from app.services.user_service import get_user_by_id_cached
 
 
 class OAuth2PasswordBearerWithCookie(OAuth2):
@@ -47,7 +46,6 @@ oauth2_scheme = OAuth2PasswordBearerWithCookie(
 
 async def get_current_user(
     request: Request,
-    db: Session = Depends(get_db), 
     token: str = Depends(oauth2_scheme)
 ):
     """
@@ -82,7 +80,7 @@ async def get_current_user(
 
     # Get user from database
     try:
-        user = get_user_by_id(db, UUID(user_id))
+        user = get_user_by_id_cached(UUID(user_id))
         if user is None:
             logger.warning(f"No user found with id {user_id}")
             raise credentials_exception
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from typing import Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class Broadcaster:
+    """
+    Fan-out of messages to the clients connected to this process.
+
+    Each client gets its own bounded queue. publish() may be called from
+    any thread (e.g. the LISTEN thread); delivery happens on the event loop.
+    A client whose queue is full is too slow to keep up and is dropped
+    rather than letting messages pile up in memory; its stream ends and
+    the browser reconnects.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def stop(self):
+        for queue in list(self._subscribers):
+            self._close(queue)
+        self._loop = None
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, message: str):
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+        loop.call_soon_threadsafe(self._fan_out, message)
+
+    def _fan_out(self, message: str):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logger.warning("Dropping a client that is not keeping up with the broadcast")
+                self._close(queue)
+
+    def _close(self, queue: asyncio.Queue):
+        # None tells the client's stream to end
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
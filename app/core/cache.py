@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-entry TTL and LRU eviction.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation, see epoch()
+        self._epoch = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def epoch(self) -> int:
+        """
+        Current invalidation epoch. Pass it to set() when filling the cache
+        from a read that started earlier, so a value loaded before an
+        invalidation is not stored after it.
+        """
+        return self._epoch
+
+    def set(self, key: Hashable, value: Any, epoch: Optional[int] = None):
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._epoch += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
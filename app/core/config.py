@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 import os
 from dotenv import load_dotenv
 
@@ -17,6 +17,35 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = os.getenv("POSTGRES_HOST")
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT")
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
+    # Total connections the app may hold against Postgres across all workers
+    DB_MAX_CONNECTIONS: int = int(os.getenv("DB_MAX_CONNECTIONS", "90"))
+    # Connections kept out of the web budget (migrations, admin, background
+    # workers); must cover the task worker's pool, which is sized from TASK_QUEUES
+    DB_RESERVED_CONNECTIONS: int = int(os.getenv("DB_RESERVED_CONNECTIONS", "30"))
+    # Connections one management process (manage.py) may hold, LISTEN
+    # connection included; must fit in DB_RESERVED_CONNECTIONS
+    DB_NON_WEB_CONNECTIONS: int = int(os.getenv("DB_NON_WEB_CONNECTIONS", "6"))
+    # "web" for the app server; the task worker and manage.py set their own
+    PROCESS_ROLE: str = os.getenv("PROCESS_ROLE", "web")
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Comma separated read replica URLs; read-only dependencies use these when set
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    # How long a replica that failed to connect is skipped before it is tried again
+    DB_REPLICA_RETRY_SECONDS: int = int(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+    # After a write, the same client reads from the primary for this long
+    DB_READ_YOUR_WRITES_SECONDS: int = int(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "10"))
+
+    # Server settings (production mode in run.py)
+    WEB_HOST: str = os.getenv("WEB_HOST", "0.0.0.0")
+    WEB_PORT: int = int(os.getenv("WEB_PORT", "8000"))
+    WEB_CONCURRENCY: Optional[int] = (
+        int(os.getenv("WEB_CONCURRENCY")) if os.getenv("WEB_CONCURRENCY") else None
+    )
+    WEB_MAX_WORKERS: int = int(os.getenv("WEB_MAX_WORKERS", "16"))
+    WORKER_MAX_REQUESTS: int = int(os.getenv("WORKER_MAX_REQUESTS", "5000"))
+    WORKER_MAX_REQUESTS_JITTER: int = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", "500"))
+    WORKER_GRACEFUL_TIMEOUT: int = int(os.getenv("WORKER_GRACEFUL_TIMEOUT", "30"))
+    WORKER_TIMEOUT: int = int(os.getenv("WORKER_TIMEOUT", "60"))
 
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -24,6 +53,63 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 2
     COOKIE_SECURE: bool = os.getenv("COOKIE_SECURE", "False").lower() == "true"
 
+    # In-process user cache, invalidated across workers via LISTEN/NOTIFY
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+    # Background task queue settings
+    # Comma separated queue:concurrency pairs handled by `python -m app.worker`
+    TASK_QUEUES: str = os.getenv("TASK_QUEUES", "default:8,alerts:4")
+    TASK_POLL_INTERVAL: float = float(os.getenv("TASK_POLL_INTERVAL", "1.0"))
+    TASK_RETRY_BASE_SECONDS: int = int(os.getenv("TASK_RETRY_BASE_SECONDS", "10"))
+    TASK_RETRY_MAX_SECONDS: int = int(os.getenv("TASK_RETRY_MAX_SECONDS", "3600"))
+    # Running tasks whose lock wasn't refreshed for this long are assumed
+    # orphaned and requeued; workers refresh it every third of this
+    TASK_LOCK_TIMEOUT_SECONDS: int = int(os.getenv("TASK_LOCK_TIMEOUT_SECONDS", "900"))
+
+    # job_ads partitioning (monthly ranges on date_posted)
+    JOB_ADS_PARTITIONS_AHEAD: int = int(os.getenv("JOB_ADS_PARTITIONS_AHEAD", "3"))
+    # Partitions older than this many months are detached and archived
+    JOB_ADS_RETENTION_MONTHS: int = int(os.getenv("JOB_ADS_RETENTION_MONTHS", "12"))
+    JOB_ADS_ARCHIVE_DIR: str = os.getenv("JOB_ADS_ARCHIVE_DIR", "archive/job_ads")
+    JOB_ADS_MAINTENANCE_INTERVAL_SECONDS: int = int(
+        os.getenv("JOB_ADS_MAINTENANCE_INTERVAL_SECONDS", str(6 * 60 * 60))
+    )
+
+    # Offline gazetteer used to geocode job ad locations
+    GAZETTEER_PATH: str = os.getenv(
+        "GAZETTEER_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "gazetteer_se.csv"),
+    )
+    # Skills dictionary (skill,synonyms CSV) used to extract job ad keywords
+    SKILLS_DICTIONARY_PATH: str = os.getenv(
+        "SKILLS_DICTIONARY_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skills.csv"),
+    )
+
+    # Ads listed on the job registry page
+    JOB_REGISTRY_MAX_ROWS: int = int(os.getenv("JOB_REGISTRY_MAX_ROWS", "5000"))
+    # Group commit of job ad creation: ads are written in batches of up to
+    # JOB_AD_WRITE_BATCH_SIZE, at most JOB_AD_WRITE_FLUSH_MS after the first
+    # one arrived; callers are answered once their batch has committed
+    JOB_AD_WRITE_BUFFER_ENABLED: bool = os.getenv("JOB_AD_WRITE_BUFFER_ENABLED", "False").lower() == "true"
+    JOB_AD_WRITE_BATCH_SIZE: int = int(os.getenv("JOB_AD_WRITE_BATCH_SIZE", "200"))
+    JOB_AD_WRITE_FLUSH_MS: int = int(os.getenv("JOB_AD_WRITE_FLUSH_MS", "20"))
+    # Ads waiting to be written per worker before submitters have to wait
+    JOB_AD_WRITE_QUEUE_SIZE: int = int(os.getenv("JOB_AD_WRITE_QUEUE_SIZE", "5000"))
+    # Live job registry feed (server-sent events)
+    # Events buffered per client; clients falling further behind are dropped
+    JOB_FEED_CLIENT_QUEUE_SIZE: int = int(os.getenv("JOB_FEED_CLIENT_QUEUE_SIZE", "100"))
+    JOB_FEED_HEARTBEAT_SECONDS: int = int(os.getenv("JOB_FEED_HEARTBEAT_SECONDS", "15"))
+
+    # CV uploads
+    CV_UPLOAD_DIR: str = os.getenv("CV_UPLOAD_DIR", "uploads/cvs")
+    CV_MAX_SIZE_BYTES: int = int(os.getenv("CV_MAX_SIZE_BYTES", str(10 * 1024 * 1024)))
+    # Processes parsing CVs per web worker, and how many parses may wait for one
+    CV_PARSER_WORKERS: int = int(os.getenv("CV_PARSER_WORKERS", "2"))
+    CV_PARSER_QUEUE_LIMIT: int = int(os.getenv("CV_PARSER_QUEUE_LIMIT", "8"))
+    CV_PARSE_TIMEOUT_SECONDS: int = int(os.getenv("CV_PARSE_TIMEOUT_SECONDS", "60"))
+
     # Google OAuth settings
     GOOGLE_CLIENT_ID: Optional[str] = os.getenv("GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET: Optional[str] = os.getenv("GOOGLE_CLIENT_SECRET")
@@ -32,6 +118,14 @@ class Settings(BaseSettings):
         "GOOGLE_REDIRECT_URI", "http://localhost:8000/api/v1/auth/callback"
     )
 
+    # Refresh stored Google access tokens this long before they expire
+    GOOGLE_TOKEN_REFRESH_AHEAD_SECONDS: int = int(
+        os.getenv("GOOGLE_TOKEN_REFRESH_AHEAD_SECONDS", "600")
+    )
+    GOOGLE_TOKEN_REFRESH_INTERVAL_SECONDS: int = int(
+        os.getenv("GOOGLE_TOKEN_REFRESH_INTERVAL_SECONDS", "60")
+    )
+
     # OpenAI settings
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
 
@@ -44,3 +138,17 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
+
+
+def parse_task_queues(spec: str) -> Dict[str, int]:
+    """
+    Parse "default:8,alerts:4" into {"default": 8, "alerts": 4}
+    """
+    queues = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, concurrency = item.partition(":")
+        queues[name.strip()] = int(concurrency or 1)
+    return queues
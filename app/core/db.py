@@ -1,7 +1,25 @@
-from sqlalchemy import create_engine
+import itertools
+import logging
+import threading
+import time
+from functools import partial
+from typing import Callable, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from .config import settings
+from sqlalchemy.orm import Session, sessionmaker
+from .config import parse_task_queues, settings
+
+# Connections the task worker needs besides its handlers: the stale task
+# reaper, the lock heartbeat and the periodic jobs
+WORKER_SERVICE_CONNECTIONS = 4
+
+# Cookie marking a client that wrote recently and must read from the primary
+PRIMARY_READS_COOKIE = "db_primary_until"
+
+logger = logging.getLogger(__name__)
 
 # Create database URL if not provided directly
 if not settings.DATABASE_URL:
@@ -12,8 +30,91 @@ if not settings.DATABASE_URL:
 else:
     SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
+
+def get_pool_limits() -> tuple[int, int]:
+    """
+    This process's share of the global connection budget.
+
+    Web workers split DB_MAX_CONNECTIONS minus the reserved connections
+    between them. The task worker gets one connection per handler it may
+    run (TASK_QUEUES), per claim loop and for its own housekeeping, and
+    management commands get DB_NON_WEB_CONNECTIONS, both out of the
+    reserve. The connection the LISTEN thread keeps outside the pool is
+    counted in every case.
+
+    Returns (pool_size, max_overflow) for this process.
+    """
+    if settings.PROCESS_ROLE == "web":
+        workers = max(1, settings.WEB_CONCURRENCY or 1)
+        budget = (settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS) // workers
+    elif settings.PROCESS_ROLE == "worker":
+        queues = parse_task_queues(settings.TASK_QUEUES)
+        budget = sum(queues.values()) + len(queues) + WORKER_SERVICE_CONNECTIONS + 1
+    else:
+        budget = settings.DB_NON_WEB_CONNECTIONS
+    per_process = max(2, budget - 1)
+    pool_size = (per_process + 1) // 2
+    return pool_size, per_process - pool_size
+
+
 # Create database engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+pool_size, max_overflow = get_pool_limits()
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    pool_size=pool_size,
+    max_overflow=max_overflow,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+)
+
+
+class ReplicaRouter:
+    """
+    Round-robin over the read replicas, skipping replicas that recently
+    failed to connect until DB_REPLICA_RETRY_SECONDS have passed.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.engines = [
+            create_engine(
+                url,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_pre_ping=True,
+            )
+            for url in urls
+        ]
+        self._counter = itertools.count()
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+        for replica in self.engines:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, replica: Engine):
+        logger.warning(f"Read replica {replica.url.host} unavailable, using other replicas")
+        with self._lock:
+            self._down_until[replica] = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+
+    def choose(self) -> Optional[Engine]:
+        """
+        Next healthy replica, or None when all of them are down
+        """
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            replica = self.engines[next(self._counter) % len(self.engines)]
+            with self._lock:
+                if self._down_until.get(replica, 0) <= now:
+                    return replica
+        return None
+
+
+replica_urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+replica_router = ReplicaRouter(replica_urls) if replica_urls else None
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -22,10 +123,148 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+@event.listens_for(SessionLocal, "after_flush")
+def _record_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _record_statement_write(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE run through session.execute() never flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _flag_request_write(session):
+    # Lets the middleware tell the client to read from the primary for a while
+    request_state = session.info.get("request_state")
+    if session.info.pop("wrote", False) and request_state is not None:
+        request_state.db_wrote = True
+
+
+def dispose_engines(close: bool = True):
+    """
+    Drop pooled connections of the primary and replica engines
+    """
+    engine.dispose(close=close)
+    if replica_router is not None:
+        for replica in replica_router.engines:
+            replica.dispose(close=close)
+
+
+def reads_from_primary(request: Request) -> bool:
+    """
+    True while the client is inside its read-your-writes window
+    """
+    if getattr(request.state, "db_wrote", False):
+        return True
+    try:
+        return float(request.cookies.get(PRIMARY_READS_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class LazySession:
+    """
+    Request-scoped unit of work.
+
+    The underlying Session is only created when it is first used, so
+    requests that never query don't touch the pool, and release() hands the
+    connection back as soon as the request's DB work is done instead of
+    holding it until the response has been rendered.
+    """
+
+    def __init__(self, factory: sessionmaker, **kwargs):
+        self._factory = factory
+        self._kwargs = kwargs
+        self._session: Optional[Session] = None
+
+    @property
+    def session(self) -> Session:
+        if self._session is None:
+            self._session = self._factory(**self._kwargs)
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def release(self):
+        """
+        End the current transaction and return its connection to the pool.
+
+        Only done when there are no pending changes. Loaded objects stay
+        usable; a later query simply checks out a connection again.
+        """
+        session = self._session
+        if session is None or not session.in_transaction():
+            return
+        if session.new or session.dirty or session.deleted:
+            return
+
+        session.expire_on_commit = False
+        try:
+            session.commit()
+        finally:
+            session.expire_on_commit = True
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+def _primary_session(request: Request) -> LazySession:
+    # One primary unit of work per request, shared by get_db and get_read_db
+    db = getattr(request.state, "db_session", None)
+    if db is None:
+        db = LazySession(SessionLocal, info={"request_state": request.state})
+        request.state.db_session = db
+    return db
+
+
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    db = _primary_session(request)
     try:
         yield db
     finally:
         db.close()
+
+
+def _choose_replica(request: Request) -> Optional[Engine]:
+    if replica_router is None or reads_from_primary(request):
+        return None
+    return replica_router.choose()
+
+
+# Dependency to get a DB session for read-only work, served by a replica when
+# one is configured and healthy
+def get_read_db(request: Request):
+    replica = _choose_replica(request)
+    db = LazySession(SessionLocal, bind=replica) if replica else _primary_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def read_session_factory(request: Request) -> Tuple[str, Callable[[], Session]]:
+    """
+    Where the request's reads go ("primary" or "replica") and a factory of
+    standalone sessions routed there, for reads that outlive the request's
+    dependencies or are shared between requests
+    """
+    replica = _choose_replica(request)
+    if replica is None:
+        return "primary", SessionLocal
+    return "replica", partial(SessionLocal, bind=replica)
+
+
+def open_read_session(request: Request) -> Session:
+    """
+    A standalone read session, routed like get_read_db, for work that
+    outlives the request's dependencies (e.g. a streamed response). The
+    caller must close it.
+    """
+    return read_session_factory(request)[1]()
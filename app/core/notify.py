@@ -0,0 +1,114 @@
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .db import engine
+
+# Seconds to wait before reconnecting a dropped LISTEN connection
+RECONNECT_DELAY = 2.0
+
+logger = logging.getLogger(__name__)
+
+
+def notify(db: Session, channel: str, payload: str):
+    """
+    Queue a Postgres NOTIFY on the session's transaction.
+
+    Listeners only receive it once the transaction commits.
+    """
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+class PgListener:
+    """
+    One LISTEN connection per process, shared by every subscriber.
+
+    Notifications are dispatched to the callbacks on a background thread,
+    so callbacks must be quick and thread-safe. Reconnect callbacks run
+    once LISTEN is back in place after the connection was lost, since
+    notifications sent in between are gone.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[str], None]]] = defaultdict(list)
+        self._reconnect_handlers: List[Callable[[], None]] = []
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]):
+        self._handlers[channel].append(callback)
+
+    def on_reconnect(self, callback: Callable[[], None]):
+        self._reconnect_handlers.append(callback)
+
+    def start(self):
+        if self._thread is not None or not self._handlers:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="pg-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _dispatch(self, channel: str, payload: str):
+        for callback in self._handlers.get(channel, []):
+            try:
+                callback(payload)
+            except Exception as e:
+                logger.error(f"Error handling notification on {channel}: {str(e)}")
+
+    def _resync(self):
+        for callback in self._reconnect_handlers:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in reconnect callback: {str(e)}")
+
+    def _listen(self, resync: bool):
+        # A dedicated connection, taken out of the pool for good
+        connection = engine.raw_connection()
+        connection.detach()
+        dbapi_connection = connection.driver_connection
+        try:
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                for channel in self._handlers:
+                    cursor.execute(f'LISTEN "{channel}"')
+            # Only now are new notifications guaranteed to arrive, so state
+            # rebuilt from here on can't miss a change
+            if resync:
+                self._resync()
+
+            while not self._stopping.is_set():
+                readable, _, _ = select.select([dbapi_connection], [], [], 1.0)
+                if not readable:
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notification = dbapi_connection.notifies.pop(0)
+                    self._dispatch(notification.channel, notification.payload)
+        finally:
+            connection.close()
+
+    def _run(self):
+        resync = False
+        while not self._stopping.is_set():
+            try:
+                self._listen(resync)
+            except Exception as e:
+                resync = True
+                logger.error(f"LISTEN connection lost: {str(e)}")
+                self._stopping.wait(RECONNECT_DELAY)
+
+
+# Process-wide listener, started with the app
+listener = PgListener()
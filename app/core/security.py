@@ -1,12 +1,20 @@
+import base64
+import hashlib
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any, Optional, Union
 
+from cryptography.fernet import Fernet
 from jose import jwt, JWTError
 from .config import settings
 
 # JWT settings
 ALGORITHM = "HS256"
 
+# Key derivation for encrypting stored secrets
+KEY_DERIVATION_SALT = b"careerdock-secret-storage"
+KEY_DERIVATION_ITERATIONS = 390000
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
@@ -35,3 +43,37 @@ def decode_access_token(token: str) -> str:
         return payload.get("sub")
     except JWTError:
         raise ValueError("Invalid token")
+
+
+@lru_cache(maxsize=1)
+def get_fernet() -> Fernet:
+    """
+    Derive the encryption key from ENCRYPTION_KEY once per process.
+
+    PBKDF2 is deliberately slow, so the resulting cipher is cached instead
+    of being rebuilt for every encrypt/decrypt.
+    """
+    if not settings.ENCRYPTION_KEY:
+        raise ValueError("ENCRYPTION_KEY is not configured")
+
+    key = hashlib.pbkdf2_hmac(
+        "sha256",
+        settings.ENCRYPTION_KEY.encode(),
+        KEY_DERIVATION_SALT,
+        KEY_DERIVATION_ITERATIONS,
+    )
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+def encrypt_secret(value: str) -> str:
+    """
+    Encrypt a secret for storage in the database
+    """
+    return get_fernet().encrypt(value.encode()).decode()
+
+
+def decrypt_secret(token: str) -> str:
+    """
+    Decrypt a secret stored with encrypt_secret
+    """
+    return get_fernet().decrypt(token.encode()).decode()
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+
+from starlette.concurrency import run_in_threadpool
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one.
+
+    While a call for a key is running, other requests asking for the same
+    key await it and get its result (or its exception) instead of running
+    the call themselves. Nothing is cached: once the call returns, the next
+    request for the key runs again.
+
+    Coalescing happens on the event loop: only the call itself runs in the
+    threadpool, and waiting requests hold no thread. The call is shared, so
+    it must not depend on one request's resources (e.g. it opens its own
+    session), and a request that goes away doesn't cancel it for the
+    others.
+
+    Results are shared between callers, so they must not be mutated.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.requests = 0
+        self.executions = 0
+
+    async def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        self.requests += 1
+        call = self._calls.get(key)
+        if call is None:
+            self.executions += 1
+            call = asyncio.ensure_future(run_in_threadpool(fn, *args, **kwargs))
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(call)
+
+    def _finish(self, key: Hashable, call: asyncio.Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the error as retrieved in case every caller went away
+        if not call.cancelled():
+            call.exception()
+
+    def stats(self) -> dict:
+        """
+        Counters for monitoring; coalescing_ratio is the share of requests
+        that were served by another request's call
+        """
+        requests, executions, in_flight = self.requests, self.executions, len(self._calls)
+        coalesced = requests - executions
+        return {
+            "name": self.name,
+            "requests": requests,
+            "executions": executions,
+            "coalesced": coalesced,
+            "coalescing_ratio": coalesced / requests if requests else 0.0,
+            "in_flight": in_flight,
+        }
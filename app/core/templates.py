@@ -0,0 +1,78 @@
+import inspect
+from typing import Iterator
+
+import anyio
+from fastapi.responses import StreamingResponse
+from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
+
+# Bytes of rendered HTML collected before a chunk is sent
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Shared by the page routes and the services that render HTMX fragments
+templates = Jinja2Templates(directory="app/templates")
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse over a sync generator that closes the generator as
+    soon as the response ends, including when the client disconnects
+    halfway (Starlette then just drops it, leaving it to the GC).
+    """
+
+    def __init__(self, content: Iterator, **kwargs):
+        super().__init__(content, **kwargs)
+        self.source = content
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                try:
+                    await run_in_threadpool(self.source.close)
+                except ValueError:
+                    # Still running in a thread after a cancelled read; it
+                    # holds nothing between chunks and is collected later
+                    pass
+
+
+def stream_template(name: str, context: dict, status_code: int = 200) -> StreamingResponse:
+    """
+    Render a template incrementally with Jinja's generate().
+
+    The browser gets the top of the page right away and the rest as it is
+    rendered, and memory stays flat when the context holds lazy iterators
+    (e.g. rows read page by page). The iteration runs in the threadpool,
+    so it may do blocking DB reads. Output is buffered into chunks of
+    about STREAM_CHUNK_SIZE to keep the number of writes and thread hops
+    down. Generators in the context are closed when the response ends,
+    whether or not the page was rendered to the end.
+
+    `context` must include the request, as for TemplateResponse.
+    """
+    template = templates.get_template(name)
+
+    def chunks() -> Iterator[str]:
+        pieces = template.generate(context)
+        buffer = []
+        size = 0
+        try:
+            for piece in pieces:
+                buffer.append(piece)
+                size += len(piece)
+                if size >= STREAM_CHUNK_SIZE:
+                    yield "".join(buffer)
+                    buffer = []
+                    size = 0
+            if buffer:
+                yield "".join(buffer)
+        finally:
+            pieces.close()
+            # Lazy iterators the template didn't finish
+            for value in context.values():
+                if inspect.isgenerator(value):
+                    value.close()
+
+    return ClosingStreamingResponse(chunks(), status_code=status_code, media_type="text/html")
@@ -2,17 +2,25 @@ from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
+import asyncio
 import os
+import time
 from uuid import UUID
 
 # Import routers and dependencies
-from app.api.v1 import auth, users
-from app.core.db import get_db
+from app.api.v1 import auth, users, job_ads, saved_searches
+from app.core.config import settings
+from app.core.db import get_db, open_read_session, PRIMARY_READS_COOKIE
 from app.core.auth import get_current_user
 from app.core.security import decode_access_token
-from app.services.user_service import get_user_by_id
+from app.core.notify import listener
+from app.core.templates import stream_template, templates
+from app.services.cv_service import shutdown_parser_pool
+from app.services.job_ad_write_buffer import job_ad_writer
+from app.services.job_feed_service import job_feed, job_feed_loader
+from app.services.job_registry_service import stream_recent_job_ads
+from app.services.user_service import get_user_by_id_cached
 from app.models.user import User
 
 app = FastAPI(title="CareerDock")
@@ -29,12 +37,53 @@ app.add_middleware(
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
-# Setup Jinja2 templates
-templates = Jinja2Templates(directory="app/templates")
-
 # Register API routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
+app.include_router(job_ads.router, prefix="/api/v1/job_ads", tags=["Job ads"])
+app.include_router(
+    saved_searches.router, prefix="/api/v1/saved_searches", tags=["Saved searches"]
+)
+
+
+@app.on_event("startup")
+def start_listener():
+    listener.start()
+
+
+@app.on_event("startup")
+async def start_job_feed():
+    loop = asyncio.get_running_loop()
+    job_feed.start(loop)
+    job_feed_loader.start(loop)
+
+
+@app.on_event("startup")
+async def start_job_ad_writer():
+    if settings.JOB_AD_WRITE_BUFFER_ENABLED:
+        job_ad_writer.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_ad_writer():
+    # Before the listener and pools go away, so buffered ads still get written
+    await job_ad_writer.stop()
+
+
+@app.on_event("shutdown")
+def stop_listener():
+    listener.stop()
+
+
+@app.on_event("shutdown")
+def stop_job_feed():
+    job_feed_loader.stop()
+    job_feed.stop()
+
+
+@app.on_event("shutdown")
+def stop_cv_parsers():
+    shutdown_parser_pool()
 
 
 @app.middleware("http")
@@ -47,10 +96,29 @@ async def add_current_user_to_template(request: Request, call_next):
     return response
 
 
+@app.middleware("http")
+async def route_reads_after_writes(request: Request, call_next):
+    """
+    After a request that committed a write, pin the client's reads to the
+    primary for a short window so it sees its own changes despite replica lag
+    """
+    response = await call_next(request)
+    if getattr(request.state, "db_wrote", False):
+        response.set_cookie(
+            key=PRIMARY_READS_COOKIE,
+            value=str(time.time() + settings.DB_READ_YOUR_WRITES_SECONDS),
+            max_age=settings.DB_READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax",
+            secure=settings.COOKIE_SECURE,
+            path="/",
+        )
+    return response
+
+
 @app.get("/", response_class=HTMLResponse)
 async def root(
     request: Request,
-    db: Session = Depends(get_db),
 ):
     """
     Serve the login page with Jinja2 templates or redirect to dashboard if already logged in
@@ -63,7 +131,7 @@ async def root(
             try:
                 user_id = decode_access_token(token)
                 if user_id:
-                    user = get_user_by_id(db, UUID(user_id))
+                    user = get_user_by_id_cached(UUID(user_id))
                     if user:
                         # User is authenticated, redirect to dashboard
                         return RedirectResponse(url="/dashboard")
@@ -117,7 +185,6 @@ async def api_info():
 @app.get("/job_registry", response_class=HTMLResponse)
 async def job_registry(
     request: Request,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -127,11 +194,13 @@ async def job_registry(
     if not current_user:
         return RedirectResponse(url="/")
 
-    # User is authenticated, show job registry
-    return templates.TemplateResponse(
+    # User is authenticated, show job registry. The ads are read page by
+    # page while the page is streamed out.
+    return stream_template(
         "job_registry.html",
         {
             "request": request,
             "user": current_user,
+            "job_ads": stream_recent_job_ads(lambda: open_read_session(request)),
         },
     )
@@ -1,4 +1,18 @@
 from app.core.db import Base
 from app.models.user import User
+from app.models.jobs import JobAd
+from app.models.tasks import BackgroundTask
+from app.models.credentials import OAuthCredential
+from app.models.saved_search import SavedSearch, SearchAlert
+from app.models.cv import UserCV
 
-__all__ = ["Base", "User"]
\ No newline at end of file
+__all__ = [
+    "Base",
+    "User",
+    "JobAd",
+    "BackgroundTask",
+    "OAuthCredential",
+    "SavedSearch",
+    "SearchAlert",
+    "UserCV",
+]
\ No newline at end of file
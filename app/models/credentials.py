@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+from app.core.db import Base
+
+
+class OAuthCredential(Base):
+    __tablename__ = "oauth_credentials"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    provider = Column(String, nullable=False, default="google")
+    # Tokens are stored encrypted with app.core.security.encrypt_secret
+    encrypted_refresh_token = Column(Text, nullable=True)
+    encrypted_access_token = Column(Text, nullable=True)
+    access_token_expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    scopes = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (UniqueConstraint("user_id", "provider"),)
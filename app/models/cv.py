@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+
+from app.core.db import Base
+
+
+class UserCV(Base):
+    __tablename__ = "user_cvs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    # Files are stored content-addressed, so identical uploads share one file
+    storage_path = Column(String, nullable=False)
+    sha256 = Column(String(64), nullable=False, index=True)
+    size_bytes = Column(Integer, nullable=False)
+    text = Column(Text, nullable=True)
+    skills = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", back_populates="cvs")
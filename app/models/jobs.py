@@ -1,19 +1,32 @@
-from sqlalchemy import Boolean, Column, String, DateTime
+from sqlalchemy import Boolean, Column, String, DateTime, Float
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.core.db import Base
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 import uuid
 
 
 class JobAd(Base):
     __tablename__ = "job_ads"
+    # Range partitioned by month of date_posted, see job_ad_partition_service.
+    # Postgres requires the partition key in the primary key.
+    __table_args__ = {"postgresql_partition_by": "RANGE (date_posted)"}
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
     company = Column(String, nullable=False)
     location = Column(String, nullable=False)
-    description = Column(String, nullable=True)
+    # By far the largest column and only needed on detail views, so it is
+    # loaded on first access unless a query undefers it
+    description = deferred(Column(String, nullable=True))
     job_url = Column(String, nullable=True)
     category = Column(String, nullable=True)
-    date_posted = Column(DateTime(timezone=True), server_default=func.now())
-    keywords = Column(String, nullable=True)
\ No newline at end of file
+    date_posted = Column(
+        DateTime(timezone=True), primary_key=True, nullable=False, server_default=func.now()
+    )
+    # Canonical skill names extracted at ingest, see skill_service
+    keywords = Column(ARRAY(String), nullable=True)
+    # Filled in from the gazetteer at ingest, see geo_service
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)
\ No newline at end of file
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, UniqueConstraint, Index, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+from app.core.db import Base
+
+
+class SavedSearch(Base):
+    __tablename__ = "saved_searches"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    name = Column(String, nullable=False)
+    # Free-text terms, all of which must appear in the ad
+    query = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+    company = Column(String, nullable=True)
+    category = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    user = relationship("User", back_populates="saved_searches")
+
+
+class SearchAlert(Base):
+    __tablename__ = "search_alerts"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    saved_search_id = Column(
+        UUID(as_uuid=True), ForeignKey("saved_searches.id", ondelete="CASCADE"), nullable=False
+    )
+    # No foreign key: job_ads is partitioned and its rows get archived
+    job_ad_id = Column(UUID(as_uuid=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Null until the alert has been delivered to the user
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("saved_search_id", "job_ad_id"),
+        Index(
+            "ix_search_alerts_pending",
+            "user_id",
+            "created_at",
+            postgresql_where=text("delivered_at IS NULL"),
+        ),
+    )
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text, BigInteger, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class TaskStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    DEAD = "dead"
+
+
+class BackgroundTask(Base):
+    __tablename__ = "background_tasks"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    queue = Column(String, nullable=False, default="default")
+    name = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(String, nullable=False, default=TaskStatus.QUEUED)
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        # Only ready rows are indexed, so claiming stays cheap as done/dead rows pile up
+        Index(
+            "ix_background_tasks_ready",
+            "queue",
+            priority.desc(),
+            "run_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
+        Index("ix_background_tasks_status", "status"),
+    )
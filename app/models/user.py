@@ -1,4 +1,5 @@
 from sqlalchemy import Boolean, Column, String, DateTime
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -16,3 +17,13 @@ class User(Base):
     google_id = Column(String, unique=True, nullable=False)  # Required for OAuth
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    saved_searches = relationship(
+        "SavedSearch", back_populates="user", cascade="all, delete-orphan"
+    )
+    cvs = relationship(
+        "UserCV",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        order_by="UserCV.created_at.desc()",
+    )
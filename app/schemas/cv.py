@@ -0,0 +1,15 @@
+from pydantic import BaseModel, UUID4
+from typing import Optional, List
+from datetime import datetime
+
+
+class CV(BaseModel):
+    id: UUID4
+    filename: str
+    content_type: Optional[str] = None
+    size_bytes: int
+    sha256: str
+    skills: Optional[List[str]] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
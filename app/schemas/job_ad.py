@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, UUID4
 from typing import Optional, List
 from datetime import datetime
 
@@ -12,12 +12,33 @@ class JobAdBase(BaseModel):
     category: Optional[str] = None
     date_posted: Optional[datetime] = None
     keywords: Optional[List[str]] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+class JobAdSummary(BaseModel):
+    """
+    What list views show; no description
+    """
+    id: UUID4
+    title: str
+    company: str
+    location: Optional[str] = None
+    date_posted: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
 
 
 class JobAdCreate(JobAdBase):
     pass
 
 
+class JobAdNearby(JobAdSummary):
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    distance_km: Optional[float] = None
+
+
 class JobAdUpdate(JobAdBase):
     title: Optional[str] = None
     company: Optional[str] = None
@@ -27,3 +48,5 @@ class JobAdUpdate(JobAdBase):
     category: Optional[str] = None
     date_posted: Optional[datetime] = None
     keywords: Optional[List[str]] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
@@ -0,0 +1,40 @@
+from pydantic import BaseModel, UUID4, model_validator
+from typing import List, Optional
+from datetime import datetime
+
+
+class SavedSearchBase(BaseModel):
+    name: str
+    query: Optional[str] = None
+    location: Optional[str] = None
+    company: Optional[str] = None
+    category: Optional[str] = None
+
+
+class SavedSearchCreate(SavedSearchBase):
+    @model_validator(mode="after")
+    def check_has_criteria(self):
+        if not any([self.query, self.location, self.company, self.category]):
+            raise ValueError("A saved search needs at least one search criterion")
+        return self
+
+
+class SavedSearch(SavedSearchBase):
+    id: UUID4
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class SearchAlert(BaseModel):
+    id: UUID4
+    saved_search_id: UUID4
+    job_ad_id: UUID4
+    created_at: datetime
+    delivered_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class SearchAlertAck(BaseModel):
+    alert_ids: List[UUID4]
@@ -0,0 +1,340 @@
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from app.core.config import settings
+from app.models.cv import UserCV
+from app.services.skill_service import extract_keywords
+
+# File types we can extract text from
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt"}
+
+logger = logging.getLogger(__name__)
+
+
+class UploadError(ValueError):
+    """
+    The upload was rejected; status_code is the HTTP status to answer with
+    """
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    filename: str
+    content_type: Optional[str]
+    size_bytes: int
+    sha256: str
+
+
+async def stream_upload_to_disk(
+    request: Request,
+    field_name: str = "file",
+    max_bytes: Optional[int] = None,
+    directory: Optional[str] = None,
+) -> StoredUpload:
+    """
+    Stream one file field of a multipart request body to disk.
+
+    The body is fed to the multipart parser chunk by chunk as it arrives,
+    so memory use stays at one chunk whatever the file size, the file is
+    hashed on the way, and the upload is aborted as soon as it exceeds
+    max_bytes.
+    """
+    max_bytes = max_bytes or settings.CV_MAX_SIZE_BYTES
+    upload_dir = Path(directory or settings.CV_UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadError("Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + 64 * 1024:
+        raise UploadError("File is too large", status_code=413)
+
+    # The parser calls back synchronously; collect events and handle them
+    # (including the blocking disk writes) after each chunk
+    events: List[tuple] = []
+    header_field = bytearray()
+    header_value = bytearray()
+    headers: Dict[bytes, bytes] = {}
+
+    def on_header_field(data, start, end):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        events.append(("part", dict(headers)))
+        headers.clear()
+
+    def on_part_data(data, start, end):
+        events.append(("data", bytes(data[start:end])))
+
+    def on_part_end():
+        events.append(("end", None))
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+
+    temp_path = upload_dir / f".upload-{uuid.uuid4().hex}"
+    output = None
+    in_file_part = False
+    finished = False
+    filename = None
+    part_content_type = None
+    size = 0
+    digest = hashlib.sha256()
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for kind, value in events:
+                if kind == "part":
+                    _, disposition = parse_options_header(value.get(b"content-disposition", b""))
+                    in_file_part = (
+                        not finished
+                        and disposition.get(b"name", b"").decode() == field_name
+                        and b"filename" in disposition
+                    )
+                    if in_file_part:
+                        filename = os.path.basename(disposition[b"filename"].decode("utf-8", "replace"))
+                        if Path(filename).suffix.lower() not in SUPPORTED_EXTENSIONS:
+                            raise UploadError("Unsupported file type, upload a PDF, DOCX or TXT file", status_code=415)
+                        part_content_type = value.get(b"content-type", b"").decode() or None
+                        output = await run_in_threadpool(open, temp_path, "wb")
+                elif kind == "data" and in_file_part:
+                    size += len(value)
+                    if size > max_bytes:
+                        raise UploadError("File is too large", status_code=413)
+                    digest.update(value)
+                    await run_in_threadpool(output.write, value)
+                elif kind == "end" and in_file_part:
+                    in_file_part = False
+                    finished = True
+            events.clear()
+        parser.finalize()
+
+        if not finished:
+            raise UploadError(f"No file found in field '{field_name}'")
+
+        await run_in_threadpool(output.close)
+        output = None
+        sha256 = digest.hexdigest()
+        suffix = Path(filename).suffix.lower()
+        path = upload_dir / f"{sha256}{suffix}"
+        # Content-addressed: a re-upload of the same file reuses the stored copy
+        await run_in_threadpool(os.replace, temp_path, path)
+        return StoredUpload(path, filename, part_content_type, size, sha256)
+    finally:
+        if output is not None:
+            output.close()
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def extract_text(path: str) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".pdf":
+        from pypdf import PdfReader
+
+        return "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+    if suffix == ".docx":
+        from docx import Document
+
+        return "\n".join(paragraph.text for paragraph in Document(path).paragraphs)
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def parse_cv_file(path: str) -> dict:
+    """
+    Extract text and skills from a CV. Runs in the parser process pool,
+    where each process builds the skill matcher once.
+    """
+    text = extract_text(path)
+    return {"text": text, "skills": extract_keywords(text)}
+
+
+_parser_pool: Optional[ProcessPoolExecutor] = None
+_parser_slots: Optional[asyncio.Semaphore] = None
+_parser_processes: Optional[asyncio.Semaphore] = None
+
+
+def get_parser_pool() -> ProcessPoolExecutor:
+    global _parser_pool
+    # Created on first use, i.e. inside the web worker rather than in the
+    # preloading master; forkserver keeps the app's threads out of the children
+    if _parser_pool is None:
+        _parser_pool = ProcessPoolExecutor(
+            max_workers=settings.CV_PARSER_WORKERS,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _parser_pool
+
+
+def recycle_parser_pool(pool: ProcessPoolExecutor):
+    """
+    Stop a pool's processes, e.g. one stuck on a file; the next parse
+    starts a fresh pool. Other parses running or queued in it fail with
+    BrokenProcessPool, and parse_cv retries them on the fresh pool.
+    """
+    global _parser_pool
+    if _parser_pool is pool:
+        _parser_pool = None
+    # shutdown() doesn't stop a task that is already running. Queued tasks
+    # aren't cancelled either: terminating the processes fails them with
+    # BrokenProcessPool, which parse_cv knows to retry.
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False)
+    for process in processes:
+        process.terminate()
+
+
+async def parse_cv(path: Path) -> dict:
+    """
+    Parse a CV in the process pool without blocking the event loop.
+
+    At most CV_PARSER_QUEUE_LIMIT parses are queued per worker; further
+    uploads wait for a slot. Only as many parses as there are processes
+    are handed to the pool, so CV_PARSE_TIMEOUT_SECONDS counts the parse
+    itself and not the wait for a process. A parse that runs past it is
+    killed with its pool before the slot is given back. Files that can't
+    be parsed raise UploadError (422).
+    """
+    global _parser_slots, _parser_processes
+    if _parser_slots is None:
+        _parser_slots = asyncio.Semaphore(settings.CV_PARSER_QUEUE_LIMIT)
+        _parser_processes = asyncio.Semaphore(settings.CV_PARSER_WORKERS)
+
+    async with _parser_slots, _parser_processes:
+        loop = asyncio.get_running_loop()
+        # A pool breaks for every parse in it when one file times out or
+        # crashes its process, so a broken pool is retried once on a fresh
+        # one; only a file that breaks that one as well is rejected
+        for attempt in range(2):
+            pool = get_parser_pool()
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(pool, parse_cv_file, str(path)),
+                    timeout=settings.CV_PARSE_TIMEOUT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Parsing {path} timed out, recycling the parser pool")
+                recycle_parser_pool(pool)
+                raise UploadError("The CV could not be parsed in time", status_code=422)
+            except BrokenProcessPool:
+                # A parser process died (e.g. out of memory on a hostile
+                # file), or another parse timed out and recycled the pool
+                recycle_parser_pool(pool)
+                if attempt == 0:
+                    logger.info(f"Parser pool broke while parsing {path}, retrying")
+                    continue
+                logger.warning(f"Parser pool broke again while parsing {path}")
+                raise UploadError("The CV could not be parsed", status_code=422)
+            except Exception as e:
+                logger.warning(f"Could not parse {path}: {str(e)}")
+                raise UploadError("The CV could not be parsed", status_code=422)
+
+
+def shutdown_parser_pool():
+    if _parser_pool is not None:
+        recycle_parser_pool(_parser_pool)
+
+
+def get_parsed_cv_by_hash(db: Session, sha256: str) -> Optional[UserCV]:
+    return (
+        db.query(UserCV)
+        .filter(UserCV.sha256 == sha256, UserCV.text.is_not(None))
+        .first()
+    )
+
+
+def get_user_cvs(db: Session, user_id: UUID) -> List[UserCV]:
+    return (
+        db.query(UserCV)
+        .filter(UserCV.user_id == user_id)
+        .order_by(UserCV.created_at.desc())
+        .all()
+    )
+
+
+def discard_upload(db: Session, upload: StoredUpload):
+    """
+    Delete a stored file no CV row points to, e.g. after a failed parse
+    """
+    referenced = db.query(UserCV.id).filter(UserCV.sha256 == upload.sha256).first()
+    if referenced is None:
+        upload.path.unlink(missing_ok=True)
+
+
+async def save_cv(db: Session, user_id: UUID, upload: StoredUpload) -> UserCV:
+    """
+    Store an uploaded CV for a user, parsing it unless a file with the same
+    hash has been parsed before
+    """
+    cached = get_parsed_cv_by_hash(db, upload.sha256)
+    if cached is not None:
+        parsed = {"text": cached.text, "skills": cached.skills}
+    else:
+        # Don't hold a pooled connection while the parser runs
+        db.release()
+        try:
+            parsed = await parse_cv(upload.path)
+        except UploadError:
+            discard_upload(db, upload)
+            raise
+
+    cv = UserCV(
+        user_id=user_id,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        storage_path=str(upload.path),
+        sha256=upload.sha256,
+        size_bytes=upload.size_bytes,
+        text=parsed["text"],
+        skills=parsed["skills"],
+    )
+    db.add(cv)
+    db.commit()
+    db.refresh(cv)
+    return cv
@@ -0,0 +1,301 @@
+import csv
+import math
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, tuple_
+from sqlalchemy.orm import Session, load_only
+
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.models.jobs import JobAd
+from app.schemas.job_ad import JobAdNearby
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9  # ~5 m cells, more than enough for city-level locations
+EARTH_RADIUS_KM = 6371.0088
+# Upper bound on the number of geohash prefixes in one query
+MAX_COVERING_CELLS = 16
+
+SPLIT_PATTERN = re.compile(r"[,/;()|\-]+")
+
+# Coalesces concurrent identical radius searches within this worker
+nearby_reads = SingleFlight("job_ad_nearby_reads")
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    latitude: float
+    longitude: float
+
+
+def fold(value: str) -> str:
+    """
+    Lowercase, collapse whitespace and strip diacritics ("Göteborg" -> "goteborg")
+    """
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer() -> Dict[str, Place]:
+    """
+    The bundled offline gazetteer, keyed by folded name and aliases.
+
+    Loaded once per process (before forking when the app is preloaded).
+    """
+    places = {}
+    with open(Path(settings.GAZETTEER_PATH), newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            place = Place(row["name"], float(row["latitude"]), float(row["longitude"]))
+            places[fold(row["name"])] = place
+            for alias in filter(None, row["aliases"].split(";")):
+                places[fold(alias)] = place
+    return places
+
+
+def resolve_location(location: Optional[str]) -> Optional[Place]:
+    """
+    Match free-text ad locations like "Göteborg", "Stockholm, Sweden" or
+    "Hybrid / Malmö" against the gazetteer
+    """
+    if not location:
+        return None
+    gazetteer = load_gazetteer()
+
+    folded = fold(location)
+    if folded in gazetteer:
+        return gazetteer[folded]
+    for part in SPLIT_PATTERN.split(folded):
+        part = part.strip()
+        if part in gazetteer:
+            return gazetteer[part]
+        for word in part.split():
+            if word in gazetteer:
+                return gazetteer[word]
+    return None
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """
+    (height, width) of a geohash cell in degrees
+    """
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_cells(
+    min_lat: float, min_lon: float, max_lat: float, max_lon: float
+) -> Set[str]:
+    """
+    Geohash prefixes that together cover a bounding box, using the finest
+    precision that needs at most MAX_COVERING_CELLS of them
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = geohash_cell_size(precision)
+        rows = math.floor(max_lat / height) - math.floor(min_lat / height) + 1
+        cols = math.floor(max_lon / width) - math.floor(min_lon / width) + 1
+        if rows * cols <= MAX_COVERING_CELLS:
+            break
+
+    cells = set()
+    for row in range(rows):
+        latitude = min(min_lat + row * height, max_lat)
+        for col in range(cols):
+            longitude = min(min_lon + col * width, max_lon)
+            cells.add(geohash_encode(latitude, longitude, precision))
+    # Make sure the far edges are covered when the box isn't cell-aligned
+    cells.add(geohash_encode(max_lat, max_lon, precision))
+    cells.add(geohash_encode(min_lat, max_lon, precision))
+    cells.add(geohash_encode(max_lat, min_lon, precision))
+    return cells
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    dlon = math.degrees(radius_km / (EARTH_RADIUS_KM * max(math.cos(math.radians(latitude)), 1e-6)))
+    return (
+        max(latitude - dlat, -90.0),
+        max(longitude - dlon, -180.0),
+        min(latitude + dlat, 90.0),
+        min(longitude + dlon, 180.0),
+    )
+
+
+def set_job_ad_coordinates(job_ad: JobAd) -> bool:
+    """
+    Normalize the ad's location at ingest: fill in coordinates from the
+    gazetteer (unless given) and the geohash used by the spatial index
+    """
+    if job_ad.latitude is None or job_ad.longitude is None:
+        place = resolve_location(job_ad.location)
+        if place is None:
+            return False
+        job_ad.latitude = place.latitude
+        job_ad.longitude = place.longitude
+    job_ad.geohash = geohash_encode(job_ad.latitude, job_ad.longitude)
+    return True
+
+
+def _filtered_query(
+    db: Session,
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    company: Optional[str] = None,
+    category: Optional[str] = None,
+):
+    query = db.query(JobAd).options(
+        load_only(
+            JobAd.id, JobAd.title, JobAd.company, JobAd.location, JobAd.date_posted,
+            JobAd.latitude, JobAd.longitude,
+        )
+    ).filter(
+        # Prefix scans on the geohash index narrow the rows down to a few
+        # grid cells, the exact box check then runs on those only
+        or_(*[JobAd.geohash.startswith(cell) for cell in covering_cells(min_lat, min_lon, max_lat, max_lon)]),
+        JobAd.latitude.between(min_lat, max_lat),
+        JobAd.longitude.between(min_lon, max_lon),
+    )
+    if company:
+        query = query.filter(JobAd.company == company)
+    if category:
+        query = query.filter(JobAd.category == category)
+    return query.order_by(JobAd.date_posted.desc())
+
+
+def get_job_ads_in_bbox(
+    db: Session,
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    company: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = 100,
+) -> List[JobAd]:
+    return _filtered_query(db, min_lat, min_lon, max_lat, max_lon, company, category).limit(limit).all()
+
+
+def get_job_ads_near(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    company: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = 100,
+) -> List[Tuple[JobAd, float]]:
+    """
+    Most recent ads within radius_km of a point, with their distance in km
+    """
+    query = _filtered_query(db, *bounding_box(latitude, longitude, radius_km), company, category)
+
+    results = []
+    # The box corners lie outside the circle, so rows are streamed and
+    # filtered by exact distance until enough are found
+    for job_ad in query.yield_per(500):
+        distance = haversine_km(latitude, longitude, job_ad.latitude, job_ad.longitude)
+        if distance <= radius_km:
+            results.append((job_ad, distance))
+            if len(results) >= limit:
+                break
+    return results
+
+
+def _load_job_ads_near(open_session: Callable[[], Session], *args) -> tuple:
+    db = open_session()
+    try:
+        # Schema objects, not ORM rows, since the result is shared between requests
+        return tuple(
+            JobAdNearby.model_validate(job_ad).model_copy(
+                update={"distance_km": round(distance, 1)}
+            )
+            for job_ad, distance in get_job_ads_near(db, *args)
+        )
+    finally:
+        db.close()
+
+
+async def find_job_ads_near(
+    open_session: Callable[[], Session],
+    route: str,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    company: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = 100,
+) -> List[JobAdNearby]:
+    """
+    get_job_ads_near for the API. Concurrent identical searches on the same
+    read route share one query; coordinates are rounded to ~10 m so
+    near-identical ones do too.
+    """
+    latitude, longitude = round(latitude, 4), round(longitude, 4)
+    company = company.strip() if company and company.strip() else None
+    category = category.strip() if category and category.strip() else None
+    args = (latitude, longitude, radius_km, company, category, limit)
+    return list(await nearby_reads.do((route, "near") + args, _load_job_ads_near, open_session, *args))
+
+
+def backfill_coordinates(db: Session, batch_size: int = 1000) -> int:
+    """
+    Geocode ads stored before coordinates were added. Returns the number of
+    ads that got coordinates.
+    """
+    located = 0
+    last = None
+    while True:
+        query = db.query(JobAd).filter(JobAd.geohash.is_(None))
+        if last is not None:
+            query = query.filter(tuple_(JobAd.date_posted, JobAd.id) > last)
+        job_ads = query.order_by(JobAd.date_posted, JobAd.id).limit(batch_size).all()
+        if not job_ads:
+            return located
+
+        for job_ad in job_ads:
+            located += set_job_ad_coordinates(job_ad)
+        last = (job_ads[-1].date_posted, job_ads[-1].id)
+        db.commit()
@@ -0,0 +1,312 @@
+import gzip
+import io
+import logging
+import os
+import re
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.db import engine
+from app.services.task_queue_service import periodic
+
+PARENT_TABLE = "job_ads"
+DEFAULT_PARTITION = "job_ads_default"
+PARTITION_NAME = re.compile(r"^job_ads_y(\d{4})m(\d{2})$")
+# pg_advisory_lock key serialising partition maintenance between workers
+MAINTENANCE_LOCK_KEY = 7_310_412
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    month = value.month - 1 + months
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    match = PARTITION_NAME.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    """
+    Names of the tables currently attached to job_ads
+    """
+    rows = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent ORDER BY child.relname"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return [row[0] for row in rows]
+
+
+def create_month_partition(conn: Connection, month: date) -> str:
+    """
+    Create the partition for one month.
+
+    Rows for that month sitting in the default partition (e.g. ads posted
+    with a future date) would make CREATE ... PARTITION OF fail, so in that
+    case the table is created standalone, the rows are moved into it and it
+    is attached. Each step can be repeated, and callers only pass months
+    that aren't attached yet, so a run that stopped before attaching is
+    finished by the next one.
+    """
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    in_default = conn.execute(
+        text(
+            f"SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE date_posted >= :start AND date_posted < :end LIMIT 1"
+        ),
+        bounds,
+    ).first()
+    values = f"FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    # Left standalone by a run that stopped between moving rows and attaching
+    standalone = conn.execute(
+        text("SELECT 1 FROM pg_tables WHERE schemaname = current_schema() AND tablename = :name"),
+        {"name": name},
+    ).first()
+    if not in_default and not standalone:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} FOR VALUES {values}"))
+        return name
+
+    logger.warning(f"Moving {month:%Y-%m} rows out of {DEFAULT_PARTITION} into {name}")
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)"))
+    # One statement, so rows are never lost even without a transaction
+    # (nothing to move when resuming after the move already happened)
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE date_posted >= :start AND date_posted < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES {values}"))
+    return name
+
+
+def ensure_partitions(
+    conn: Connection, start: Optional[date] = None, months_ahead: Optional[int] = None
+) -> List[str]:
+    """
+    Create the monthly partitions from `start` (default: this month) up to
+    JOB_ADS_PARTITIONS_AHEAD months ahead.
+
+    Partitions are created before they receive rows, so new ads normally
+    never land in the default partition. A month that can't be created is
+    logged and skipped so the other months are still created.
+
+    `conn` must be in autocommit mode.
+    """
+    if months_ahead is None:
+        months_ahead = settings.JOB_ADS_PARTITIONS_AHEAD
+    current = month_start(datetime.now(timezone.utc).date())
+    month = month_start(start) if start else current
+    last = add_months(current, months_ahead)
+
+    attached = set(list_partitions(conn))
+    ensured = []
+    while month <= last:
+        name = partition_name(month)
+        try:
+            if name not in attached:
+                create_month_partition(conn, month)
+            ensured.append(name)
+        except Exception as e:
+            logger.error(f"Could not create partition {name}, will retry later: {str(e)}")
+        month = add_months(month, 1)
+    return ensured
+
+
+def create_partitioned_index(
+    conn: Connection, name: str, columns: str, using: Optional[str] = None, include: Optional[str] = None
+):
+    """
+    Build an index on job_ads without locking writes.
+
+    CREATE INDEX CONCURRENTLY is not supported on a partitioned table, so
+    the parent index is created empty (ON ONLY), each partition is indexed
+    concurrently and then attached. Once every partition is attached the
+    parent index becomes valid, and future partitions get it automatically.
+
+    `conn` must be in autocommit mode (e.g. inside alembic's
+    autocommit_block()).
+    """
+    method = f" USING {using}" if using else ""
+    covering = f" INCLUDE ({include})" if include else ""
+    conn.execute(
+        text(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {PARENT_TABLE}{method} ({columns}){covering}")
+    )
+
+    for partition in list_partitions(conn):
+        # Postgres truncates identifiers at 63 characters
+        child = f"{partition}_{name}"[:63]
+        conn.execute(
+            text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition}{method} ({columns}){covering}")
+        )
+        attached = conn.execute(
+            text(
+                "SELECT 1 FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :parent AND child.relname = :child"
+            ),
+            {"parent": name, "child": child},
+        ).first()
+        if not attached:
+            conn.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
+
+
+def drop_partitioned_index(conn: Connection, name: str, attempts: int = 10):
+    """
+    Drop an index on job_ads; the attached partition indexes go with it.
+
+    That needs a brief ACCESS EXCLUSIVE lock on every partition, so rather
+    than queueing behind long queries (and blocking everything queued
+    behind it) it gives up after lock_timeout and retries.
+
+    `conn` must be in autocommit mode.
+    """
+    conn.execute(text("SET lock_timeout = '5s'"))
+    try:
+        for attempt in range(attempts):
+            try:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                return
+            except OperationalError:
+                conn.rollback()
+                if attempt == attempts - 1:
+                    raise
+                logger.warning(f"Could not lock job_ads to drop {name}, retrying")
+                time.sleep(1)
+    finally:
+        conn.execute(text("RESET lock_timeout"))
+
+
+def list_detached_partitions(conn: Connection) -> List[str]:
+    """
+    Monthly tables that were detached but not yet archived, e.g. because a
+    previous archive run was interrupted
+    """
+    attached = set(list_partitions(conn))
+    rows = conn.execute(
+        text(
+            "SELECT tablename FROM pg_tables "
+            "WHERE schemaname = current_schema() AND tablename LIKE :pattern"
+        ),
+        {"pattern": f"{PARENT_TABLE}_y%"},
+    )
+    return sorted(
+        row[0] for row in rows if row[0] not in attached and partition_month(row[0])
+    )
+
+
+def archive_table(conn: Connection, name: str, archive_dir: Path) -> Path:
+    """
+    Dump a detached partition to a gzipped CSV file, then drop it
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}.csv.gz"
+    partial = archive_dir / f"{name}.csv.gz.partial"
+
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        with open(partial, "wb") as raw:
+            compressed = gzip.GzipFile(fileobj=raw, mode="wb")
+            with io.TextIOWrapper(compressed, encoding="utf-8") as archive:
+                cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+            # Only drop the table once the archive is safely on disk
+            raw.flush()
+            os.fsync(raw.fileno())
+    finally:
+        cursor.close()
+    os.replace(partial, path)
+
+    conn.execute(text(f"DROP TABLE {name}"))
+    return path
+
+
+def archive_old_partitions(
+    conn: Connection, retention_months: Optional[int] = None, archive_dir: Optional[str] = None
+) -> List[Path]:
+    """
+    Detach partitions older than the retention period and move them to
+    compressed archive files.
+
+    DETACH ... CONCURRENTLY can't be used while a default partition exists,
+    so a plain DETACH is run with a short lock_timeout; if it can't get the
+    lock quickly the partition is simply retried on the next run.
+
+    `conn` must be in autocommit mode.
+    """
+    if retention_months is None:
+        retention_months = settings.JOB_ADS_RETENTION_MONTHS
+    directory = Path(archive_dir or settings.JOB_ADS_ARCHIVE_DIR)
+    cutoff = add_months(month_start(datetime.now(timezone.utc).date()), -retention_months)
+
+    for partition in list_partitions(conn):
+        month = partition_month(partition)
+        if month is None or month >= cutoff:
+            continue
+        try:
+            conn.execute(text("SET lock_timeout = '5s'"))
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition}"))
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"Could not detach {partition}, will retry later: {str(e)}")
+        finally:
+            conn.execute(text("RESET lock_timeout"))
+
+    archived = []
+    for table in list_detached_partitions(conn):
+        # A recent month can be detached only because create_month_partition
+        # was interrupted; ensure_partitions attaches it again
+        if partition_month(table) >= cutoff:
+            continue
+        path = archive_table(conn, table, directory)
+        logger.info(f"Archived {table} to {path}")
+        archived.append(path)
+    return archived
+
+
+@periodic("maintain_job_ad_partitions", settings.JOB_ADS_MAINTENANCE_INTERVAL_SECONDS)
+def maintain_partitions() -> Tuple[List[str], List[Path]]:
+    """
+    Scheduled maintenance: keep future partitions ready and archive old ones.
+
+    Guarded by an advisory lock so only one worker does it at a time.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        locked = conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+        ).scalar()
+        if not locked:
+            return [], []
+        try:
+            created = ensure_partitions(conn)
+            archived = archive_old_partitions(conn)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+    return created, archived
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.jobs import JobAd
+from app.schemas.job_ad import JobAdCreate
+from app.services.job_registry_service import create_job_ad, create_job_ads
+
+logger = logging.getLogger(__name__)
+
+
+class JobAdWriteBuffer:
+    """
+    Group commit for job ad creation.
+
+    Callers submit an ad and wait; a single flusher per worker collects
+    submissions until it has JOB_AD_WRITE_BATCH_SIZE of them or
+    JOB_AD_WRITE_FLUSH_MS has passed since the first one, and inserts the
+    whole batch in one transaction, so one commit (and one WAL fsync) is
+    paid per batch instead of per ad.
+
+    Durability: submit() only returns once the ad's transaction has
+    committed, exactly like create_job_ad. An ad whose caller hasn't been
+    answered yet lives only in this process's memory; if the worker dies
+    it is lost and the caller gets an error, never a false success. Ads
+    whose caller went away before the batch was written are skipped.
+
+    If a batch fails (e.g. one invalid row), its ads are retried one per
+    transaction so only the offending ad fails.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, queue_size: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.batches = 0
+        self.written = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None
+
+    def start(self):
+        if self._flusher is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Write what is still buffered, then stop the flusher
+        """
+        if self._flusher is None:
+            return
+        await self._queue.put(None)
+        await self._flusher
+        self._flusher = None
+
+    async def submit(self, job_ad_in: JobAdCreate) -> JobAd:
+        """
+        Create an ad through the buffer; returns once it is committed
+        """
+        future = asyncio.get_running_loop().create_future()
+        # Waits when the buffer is full, pushing back on the callers
+        await self._queue.put((job_ad_in, future))
+        return await future
+
+    async def _next_batch(self) -> Tuple[List[tuple], bool]:
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+
+        batch = [item]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            try:
+                item = self._queue.get_nowait() if remaining <= 0 else await asyncio.wait_for(
+                    self._queue.get(), remaining
+                )
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            # Nobody is waiting for these any more, so they were never acknowledged
+            batch = [(job_ad_in, future) for job_ad_in, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                results = await run_in_threadpool(self._write, [job_ad_in for job_ad_in, _ in batch])
+            except Exception as e:
+                logger.error(f"Error writing job ad batch: {str(e)}")
+                results = [e] * len(batch)
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _write(self, job_ads_in: List[JobAdCreate]) -> list:
+        # Objects stay loaded after commit so they can be handed to the callers
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            try:
+                job_ads = create_job_ads(db, job_ads_in)
+                self.batches += 1
+                self.written += len(job_ads)
+                return job_ads
+            except Exception as e:
+                db.rollback()
+                if len(job_ads_in) == 1:
+                    return [e]
+                logger.warning(f"Job ad batch of {len(job_ads_in)} failed, writing one by one: {str(e)}")
+
+            results = []
+            for job_ad_in in job_ads_in:
+                try:
+                    results.append(create_job_ad(db, job_ad_in))
+                    self.batches += 1
+                    self.written += 1
+                except Exception as e:
+                    db.rollback()
+                    results.append(e)
+            return results
+        finally:
+            db.close()
+
+
+# Per-worker buffer, started with the app when JOB_AD_WRITE_BUFFER_ENABLED is set
+job_ad_writer = JobAdWriteBuffer(
+    batch_size=settings.JOB_AD_WRITE_BATCH_SIZE,
+    flush_interval=settings.JOB_AD_WRITE_FLUSH_MS / 1000,
+    queue_size=settings.JOB_AD_WRITE_QUEUE_SIZE,
+)
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Request
+from sqlalchemy.orm import Session, load_only
+from starlette.concurrency import run_in_threadpool
+
+from app.core.broadcast import Broadcaster
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.notify import listener, notify
+from app.core.templates import templates
+from app.models.jobs import JobAd
+
+JOB_ADS_CHANNEL = "job_ads"
+
+# Per-process fan-out of new job ads to the open job registry pages
+job_feed = Broadcaster(settings.JOB_FEED_CLIENT_QUEUE_SIZE)
+
+logger = logging.getLogger(__name__)
+
+
+def publish_job_ad(db: Session, job_ad: JobAd):
+    """
+    Announce a new ad to every web worker once the transaction commits.
+
+    Only the primary key is sent: NOTIFY payloads are limited to 8000
+    bytes and an oversized one would fail the whole transaction. Each
+    worker loads the ad back once, see JobFeedLoader.
+    """
+    payload = {
+        "id": str(job_ad.id),
+        "date_posted": job_ad.date_posted.isoformat() if job_ad.date_posted else None,
+    }
+    notify(db, JOB_ADS_CHANNEL, json.dumps(payload))
+
+
+def load_job_ad_rows(announced: List[Tuple[UUID, Optional[datetime]]]) -> List[str]:
+    """
+    Rendered feed rows for announced (id, date_posted) pairs, in the order
+    they were announced, loaded with one query
+    """
+    # The primary: the notification can arrive before a replica has the row
+    db = SessionLocal()
+    try:
+        query = db.query(JobAd).options(
+            load_only(JobAd.id, JobAd.title, JobAd.company, JobAd.location, JobAd.date_posted, JobAd.keywords)
+        )
+        query = query.filter(JobAd.id.in_([job_ad_id for job_ad_id, _ in announced]))
+        dates = {date_posted for _, date_posted in announced}
+        if None not in dates:
+            # Only the matching partitions are searched
+            query = query.filter(JobAd.date_posted.in_(dates))
+        job_ads = {job_ad.id: job_ad for job_ad in query}
+        return [
+            render_job_ad_row(job_ads[job_ad_id])
+            for job_ad_id, _ in announced
+            if job_ad_id in job_ads
+        ]
+    finally:
+        db.close()
+
+
+def render_job_ad_row(job_ad) -> str:
+    return templates.get_template("includes/job_ad_row.html").render(job_ad=job_ad)
+
+
+def format_event(event: str, data: str) -> str:
+    lines = "".join(f"data: {line}\n" for line in data.splitlines())
+    return f"event: {event}\n{lines}\n"
+
+
+class JobFeedLoader:
+    """
+    Loads announced ads for the live feed without blocking the LISTEN
+    thread.
+
+    The LISTEN callback only hands the id to the event loop. One task per
+    worker then loads every id that has arrived since its last query in a
+    single query in the threadpool, renders each ad once and publishes the
+    same string to every client.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[UUID, Optional[datetime]]] = []
+        self._loader: Optional[asyncio.Task] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def stop(self):
+        self._loop = None
+        self._pending = []
+        if self._loader is not None:
+            self._loader.cancel()
+            self._loader = None
+
+    def submit(self, job_ad_id: UUID, date_posted: Optional[datetime]):
+        """
+        Queue an announced ad; may be called from any thread
+        """
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._queue, job_ad_id, date_posted)
+
+    def _queue(self, job_ad_id: UUID, date_posted: Optional[datetime]):
+        if self._loop is None:
+            return
+        self._pending.append((job_ad_id, date_posted))
+        if self._loader is None:
+            self._loader = self._loop.create_task(self._run())
+
+    async def _run(self):
+        try:
+            while self._pending:
+                announced, self._pending = self._pending, []
+                try:
+                    rows = await run_in_threadpool(load_job_ad_rows, announced)
+                except Exception as e:
+                    logger.error(f"Error loading {len(announced)} job ads for the live feed: {str(e)}")
+                    continue
+                for row in rows:
+                    job_feed.publish(format_event("job_ad", row))
+        finally:
+            self._loader = None
+
+
+job_feed_loader = JobFeedLoader()
+
+
+def _on_job_ad(payload: str):
+    # Called from the LISTEN thread, so it only parses the payload
+    if not job_feed.has_subscribers():
+        return
+    data = json.loads(payload)
+    date_posted = datetime.fromisoformat(data["date_posted"]) if data.get("date_posted") else None
+    job_feed_loader.submit(UUID(data["id"]), date_posted)
+
+
+listener.subscribe(JOB_ADS_CHANNEL, _on_job_ad)
+
+
+async def job_ad_events(request: Request) -> AsyncIterator[str]:
+    """
+    Server-sent event stream of new job ads for one client
+    """
+    queue = job_feed.subscribe()
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    queue.get(), timeout=settings.JOB_FEED_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comment line; keeps proxies from closing an idle stream
+                yield ": ping\n\n"
+                continue
+            if message is None:
+                break
+            yield message
+    finally:
+        job_feed.unsubscribe(queue)
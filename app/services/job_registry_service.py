@@ -1,12 +1,205 @@
-from app.schemas.job_ad import JobAdBase, JobAdCreate, JobAdUpdate
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from app.schemas.job_ad import JobAdBase, JobAdCreate, JobAdSummary, JobAdUpdate
 from app.core.config import settings
+from app.core.singleflight import SingleFlight
 from app.models.jobs import JobAd
+from app.services.geo_service import set_job_ad_coordinates
+from app.services.job_feed_service import publish_job_ad
+from app.services.skill_service import canonical_keyword, extract_keywords
+from app.services.task_queue_service import enqueue_task
 
-from sqlalchemy.orm import Session
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, load_only, undefer
 from sqlalchemy import update
 
+# Coalesces concurrent identical listing queries within this worker
+job_ad_reads = SingleFlight("job_ad_reads")
+
+# Columns list views read; covered by ix_job_ads_date_posted_summary
+SUMMARY_COLUMNS = (JobAd.id, JobAd.title, JobAd.company, JobAd.location, JobAd.date_posted)
+
+
+def build_job_ad(job_ad_in: JobAdCreate) -> JobAd:
+    """
+    Turn an incoming ad into a JobAd row with its location and keywords
+    normalized
+    """
+    # Unset fields (e.g. date_posted) fall back to the column defaults
+    data = job_ad_in.model_dump(exclude_none=True)
+    data["keywords"] = extract_keywords(
+        job_ad_in.title, job_ad_in.description, extra=job_ad_in.keywords or ()
+    )
+    job_ad = JobAd(**data)
+    set_job_ad_coordinates(job_ad)
+    return job_ad
+
+
+def announce_job_ad(db: Session, job_ad: JobAd, live: bool = True):
+    """
+    Side effects of a new ad, all taking effect when the transaction commits
+    """
+    # Matched against saved searches by the worker
+    enqueue_task(db, "percolate_job_ad", {"job_ad_id": str(job_ad.id)}, queue="alerts", commit=False)
+    # Pushed to the open job registry pages
+    if live:
+        publish_job_ad(db, job_ad)
+
+
 def create_job_ad(db: Session, job_ad: JobAdCreate) -> JobAd:
-    job_ad = JobAd(**job_ad.model_dump())
+    job_ad = build_job_ad(job_ad)
     db.add(job_ad)
+    db.flush()
+    announce_job_ad(db, job_ad)
     db.commit()
     return job_ad
+
+
+def create_job_ads(db: Session, job_ads_in: List[JobAdCreate], live: bool = True) -> List[JobAd]:
+    """
+    Insert several ads in one transaction, with the same side effects as
+    create_job_ad
+    """
+    job_ads = [build_job_ad(job_ad_in) for job_ad_in in job_ads_in]
+    db.add_all(job_ads)
+    db.flush()
+    for job_ad in job_ads:
+        announce_job_ad(db, job_ad, live=live)
+    db.commit()
+    return job_ads
+
+
+def import_job_ads(db: Session, job_ads: Iterable[JobAdCreate], batch_size: int = 500) -> int:
+    """
+    Bulk import, committing every batch_size ads. Returns the number imported.
+    """
+    imported = 0
+    batch = []
+    for job_ad_in in job_ads:
+        batch.append(job_ad_in)
+        if len(batch) >= batch_size:
+            imported += _store_batch(db, batch)
+            batch = []
+    if batch:
+        imported += _store_batch(db, batch)
+    return imported
+
+
+def _store_batch(db: Session, batch: List[JobAdCreate]) -> int:
+    # Bulk imports aren't pushed to the live feed
+    create_job_ads(db, batch, live=False)
+    db.expunge_all()
+    return len(batch)
+
+
+def refresh_keywords(db: Session, batch_size: int = 1000) -> int:
+    """
+    Re-run keyword extraction over the stored ads, e.g. for ads imported
+    before extraction existed or after skills were added to the dictionary.
+    Existing keywords are kept. Returns the number of ads that changed.
+    """
+    changed = 0
+    last = None
+    while True:
+        query = db.query(JobAd).options(undefer(JobAd.description))
+        if last is not None:
+            query = query.filter(tuple_(JobAd.date_posted, JobAd.id) > last)
+        job_ads = query.order_by(JobAd.date_posted, JobAd.id).limit(batch_size).all()
+        if not job_ads:
+            return changed
+
+        for job_ad in job_ads:
+            keywords = extract_keywords(job_ad.title, job_ad.description, extra=job_ad.keywords or ())
+            if keywords != (job_ad.keywords or []):
+                job_ad.keywords = keywords
+                changed += 1
+        last = (job_ads[-1].date_posted, job_ads[-1].id)
+        db.commit()
+
+
+def _load_recent_page(open_session: Callable[[], Session], after: Optional[tuple], size: int) -> List[JobAd]:
+    db = open_session()
+    try:
+        query = db.query(JobAd).options(load_only(*SUMMARY_COLUMNS, JobAd.keywords))
+        if after is not None:
+            query = query.filter(tuple_(JobAd.date_posted, JobAd.id) < after)
+        return query.order_by(JobAd.date_posted.desc(), JobAd.id.desc()).limit(size).all()
+    finally:
+        # Loaded attributes stay readable on the detached rows
+        db.close()
+
+
+def stream_recent_job_ads(
+    open_session: Callable[[], Session], limit: Optional[int] = None, batch_size: int = 500
+) -> Iterator[JobAd]:
+    """
+    Most recent ads first, read lazily in keyset pages of batch_size.
+
+    Meant to be consumed while a response is streamed, after the request's
+    own session is gone. Every page gets its own short-lived session, so
+    no connection or transaction is held while rows are sent to a slow
+    client.
+    """
+    if limit is None:
+        limit = settings.JOB_REGISTRY_MAX_ROWS
+    after = None
+    while limit > 0:
+        job_ads = _load_recent_page(open_session, after, min(batch_size, limit))
+        yield from job_ads
+        if len(job_ads) < min(batch_size, limit):
+            return
+        limit -= len(job_ads)
+        after = (job_ads[-1].date_posted, job_ads[-1].id)
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    value = value.strip() if value else None
+    return value or None
+
+
+def _load_job_ads(
+    open_session: Callable[[], Session],
+    skip: int,
+    limit: int,
+    company: Optional[str],
+    category: Optional[str],
+    keyword: Optional[str],
+) -> tuple:
+    db = open_session()
+    try:
+        query = db.query(JobAd).options(load_only(*SUMMARY_COLUMNS))
+        if company:
+            query = query.filter(JobAd.company == company)
+        if category:
+            query = query.filter(JobAd.category == category)
+        if keyword:
+            # Served by the GIN index on keywords
+            query = query.filter(JobAd.keywords.contains([keyword]))
+        job_ads = query.order_by(JobAd.date_posted.desc(), JobAd.id.desc()).offset(skip).limit(limit).all()
+        # Plain schema objects rather than ORM rows, since the result is
+        # shared between requests
+        return tuple(JobAdSummary.model_validate(job_ad) for job_ad in job_ads)
+    finally:
+        db.close()
+
+
+async def get_all_job_ads(
+    open_session: Callable[[], Session],
+    route: str,
+    skip: int = 0,
+    limit: int = 100,
+    company: Optional[str] = None,
+    category: Optional[str] = None,
+    keyword: Optional[str] = None,
+) -> List[JobAdSummary]:
+    """
+    Most recent ads, optionally filtered.
+
+    Concurrent requests with the same (normalized) parameters and the same
+    read route share one query, see job_ad_reads; `open_session` and
+    `route` come from read_session_factory.
+    """
+    company, category = _clean(company), _clean(category)
+    keyword = canonical_keyword(keyword) if keyword else None
+    key = (route, "all", skip, limit, company, category, keyword)
+    return list(await job_ad_reads.do(key, _load_job_ads, open_session, skip, limit, company, category, keyword))
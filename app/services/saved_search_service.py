@@ -0,0 +1,365 @@
+import logging
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, undefer
+
+from app.core.db import SessionLocal
+from app.core.notify import listener, notify
+from app.models.jobs import JobAd
+from app.models.saved_search import SavedSearch, SearchAlert
+from app.schemas.saved_search import SavedSearchCreate
+from app.schemas.saved_search import SearchAlert as SearchAlertSchema
+from app.services.skill_service import load_skill_matcher
+from app.services.skill_service import normalize as normalize_text
+from app.services.task_queue_service import task
+
+SAVED_SEARCH_CHANNEL = "saved_search_changed"
+TOKEN_PATTERN = re.compile(r"\w+")
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidSavedSearch(ValueError):
+    """
+    The saved search has nothing an ad could be matched on
+    """
+
+
+def tokenize(value: Optional[str]) -> Set[str]:
+    if not value:
+        return set()
+    return {token for token in TOKEN_PATTERN.findall(value.lower()) if len(token) > 1}
+
+
+def normalize(value: Optional[str]) -> Optional[str]:
+    return " ".join(value.lower().split()) if value else None
+
+
+def compile_query(query: Optional[str]) -> Tuple[Set[str], Set[str]]:
+    """
+    Split a query into the canonical skills it names and its other words.
+
+    Skills are found with the skills dictionary, the same way job ads get
+    their keywords, so "C#", "C++" or "cpp" survive as a skill instead of
+    being lost to tokenizing.
+    """
+    if not query:
+        return set(), set()
+    text = normalize_text(query)
+    skills = set()
+    rest = []
+    last_end = 0
+    for start, end, skill in load_skill_matcher().find(text):
+        skills.add(skill)
+        rest.append(text[last_end:start])
+        last_end = end
+    rest.append(text[last_end:])
+    return skills, tokenize(" ".join(rest))
+
+
+class CompiledSearch:
+    """
+    A saved search reduced to the keys an ad must contain
+    """
+
+    def __init__(self, saved_search: SavedSearch):
+        self.id = saved_search.id
+        self.user_id = saved_search.user_id
+        self.skills, self.terms = compile_query(saved_search.query)
+        self.location_terms = tokenize(saved_search.location)
+        self.company = normalize(saved_search.company)
+        self.category = normalize(saved_search.category)
+
+    def required_keys(self) -> Set[str]:
+        keys = set(self.terms)
+        keys.update(f"skill:{skill}" for skill in self.skills)
+        keys.update(f"location:{term}" for term in self.location_terms)
+        if self.company:
+            keys.add(f"company:{self.company}")
+        if self.category:
+            keys.add(f"category:{self.category}")
+        return keys
+
+
+def job_ad_keys(job_ad: JobAd) -> Set[str]:
+    """
+    Everything a saved search can require, extracted from one ad
+    """
+    keys = tokenize(" ".join(filter(None, [
+        job_ad.title, job_ad.description, job_ad.company, job_ad.location, job_ad.category,
+    ])))
+    # keywords already hold the canonical skills found in the ad
+    keys.update(f"skill:{skill}" for skill in job_ad.keywords or [])
+    keys.update(f"location:{term}" for term in tokenize(job_ad.location))
+    if job_ad.company:
+        keys.add(f"company:{normalize(job_ad.company)}")
+    if job_ad.category:
+        keys.add(f"category:{normalize(job_ad.category)}")
+    return keys
+
+
+class SavedSearchIndex:
+    """
+    Percolator-style inverted index from keys to saved searches.
+
+    A search matches only if the ad has every one of its required keys, so
+    each search is posted under just one of them, the one with the
+    shortest posting list at the time. Matching an ad then only looks at
+    searches posted under keys the ad has, instead of every saved search.
+
+    Changes arrive as ids from the LISTEN thread, which only queues them;
+    the worker applies them from the database before matching. Queueing
+    starts before the first rebuild reads its snapshot, so a search saved
+    while the snapshot is being read is applied afterwards. A rebuild that
+    started before invalidate() (e.g. a LISTEN reconnect, which can lose
+    notifications) doesn't mark the index loaded, like the TTLCache epoch.
+    """
+
+    def __init__(self):
+        self._searches: Dict[UUID, CompiledSearch] = {}
+        self._postings: Dict[str, Set[UUID]] = defaultdict(set)
+        self._anchors: Dict[UUID, str] = {}
+        self._lock = threading.Lock()
+        # Guards the change queue and epoch only, so queueing never waits
+        # for a rebuild
+        self._changes_lock = threading.Lock()
+        self._changed: Set[UUID] = set()
+        self._tracking = False
+        self._epoch = 0
+        self.loaded = False
+
+    def _add(self, search: CompiledSearch):
+        self._remove(search.id)
+        keys = search.required_keys()
+        if not keys:
+            return
+        anchor = min(keys, key=lambda key: (len(self._postings.get(key, ())), -len(key)))
+        self._searches[search.id] = search
+        self._postings[anchor].add(search.id)
+        self._anchors[search.id] = anchor
+
+    def _remove(self, search_id: UUID):
+        anchor = self._anchors.pop(search_id, None)
+        self._searches.pop(search_id, None)
+        if anchor is not None:
+            self._postings[anchor].discard(search_id)
+            if not self._postings[anchor]:
+                del self._postings[anchor]
+
+    def add(self, saved_search: SavedSearch):
+        with self._lock:
+            self._add(CompiledSearch(saved_search))
+
+    def remove(self, search_id: UUID):
+        with self._lock:
+            self._remove(search_id)
+
+    def mark_changed(self, *search_ids: UUID):
+        with self._changes_lock:
+            # Until the first rebuild nothing is indexed, so there is
+            # nothing to keep (web processes never build the index)
+            if self._tracking:
+                self._changed.update(search_ids)
+
+    def take_changed(self) -> Set[UUID]:
+        with self._changes_lock:
+            changed, self._changed = self._changed, set()
+        return changed
+
+    def invalidate(self):
+        with self._changes_lock:
+            self._epoch += 1
+            self.loaded = False
+
+    def start_rebuild(self) -> int:
+        """
+        Start queueing changes; returns the epoch to pass to rebuild, read
+        before the snapshot is
+        """
+        with self._changes_lock:
+            self._tracking = True
+            return self._epoch
+
+    def rebuild(self, saved_searches: Iterable[SavedSearch], epoch: int):
+        with self._lock:
+            self._searches.clear()
+            self._postings.clear()
+            self._anchors.clear()
+            for saved_search in saved_searches:
+                self._add(CompiledSearch(saved_search))
+            with self._changes_lock:
+                self.loaded = epoch == self._epoch
+
+    def match(self, job_ad: JobAd) -> List[CompiledSearch]:
+        keys = job_ad_keys(job_ad)
+        with self._lock:
+            candidates = set()
+            for key in keys:
+                candidates.update(self._postings.get(key, ()))
+            searches = [self._searches[search_id] for search_id in candidates]
+        return [search for search in searches if search.required_keys() <= keys]
+
+    def __len__(self) -> int:
+        return len(self._searches)
+
+
+# Per-process index, used by the worker that percolates new ads
+index = SavedSearchIndex()
+
+
+def sync_index(db: Session):
+    """
+    Load the index if needed, then apply the saved searches created or
+    deleted since
+    """
+    if not index.loaded:
+        epoch = index.start_rebuild()
+        index.rebuild(db.query(SavedSearch).yield_per(1000), epoch)
+
+    changed = index.take_changed()
+    if not changed:
+        return
+    try:
+        found = {
+            saved_search.id: saved_search
+            for saved_search in db.query(SavedSearch).filter(SavedSearch.id.in_(changed))
+        }
+    except Exception:
+        index.mark_changed(*changed)
+        raise
+    for search_id in changed:
+        if search_id in found:
+            index.add(found[search_id])
+        else:
+            index.remove(search_id)
+
+
+def _queue_saved_search(payload: str):
+    # Called from the LISTEN thread, which must not block on the database
+    index.mark_changed(UUID(payload))
+
+
+listener.subscribe(SAVED_SEARCH_CHANNEL, _queue_saved_search)
+listener.on_reconnect(index.invalidate)
+
+
+def get_saved_searches(db: Session, user_id: UUID) -> List[SavedSearch]:
+    return (
+        db.query(SavedSearch)
+        .filter(SavedSearch.user_id == user_id)
+        .order_by(SavedSearch.created_at)
+        .all()
+    )
+
+
+def create_saved_search(db: Session, user_id: UUID, saved_search_in: SavedSearchCreate) -> SavedSearch:
+    saved_search = SavedSearch(user_id=user_id, **saved_search_in.model_dump())
+    if not CompiledSearch(saved_search).required_keys():
+        raise InvalidSavedSearch("The saved search has no terms that job ads can be matched on")
+    db.add(saved_search)
+    db.flush()
+    notify(db, SAVED_SEARCH_CHANNEL, str(saved_search.id))
+    db.commit()
+    db.refresh(saved_search)
+    return saved_search
+
+
+def delete_saved_search(db: Session, user_id: UUID, search_id: UUID) -> bool:
+    saved_search = (
+        db.query(SavedSearch)
+        .filter(SavedSearch.id == search_id, SavedSearch.user_id == user_id)
+        .first()
+    )
+    if saved_search is None:
+        return False
+    db.delete(saved_search)
+    notify(db, SAVED_SEARCH_CHANNEL, str(search_id))
+    db.commit()
+    return True
+
+
+def get_pending_alerts(db: Session, user_id: UUID) -> List[SearchAlert]:
+    """
+    Alerts not yet acknowledged by the user, oldest first
+    """
+    return (
+        db.query(SearchAlert)
+        .filter(SearchAlert.user_id == user_id, SearchAlert.delivered_at.is_(None))
+        .order_by(SearchAlert.created_at)
+        .all()
+    )
+
+
+def acknowledge_alerts(db: Session, user_id: UUID, alert_ids: List[UUID]) -> List[SearchAlertSchema]:
+    """
+    Mark a user's alerts as delivered and return the ones that changed.
+
+    One UPDATE ... RETURNING; the result is built before the commit, so
+    nothing is loaded again afterwards.
+    """
+    if not alert_ids:
+        return []
+    rows = db.execute(
+        update(SearchAlert)
+        .where(
+            SearchAlert.user_id == user_id,
+            SearchAlert.id.in_(alert_ids),
+            SearchAlert.delivered_at.is_(None),
+        )
+        .values(delivered_at=func.now())
+        .returning(
+            SearchAlert.id,
+            SearchAlert.saved_search_id,
+            SearchAlert.job_ad_id,
+            SearchAlert.created_at,
+            SearchAlert.delivered_at,
+        ),
+        execution_options={"synchronize_session": False},
+    ).mappings().all()
+    alerts = [SearchAlertSchema.model_validate(dict(row)) for row in rows]
+    db.commit()
+    return alerts
+
+
+@task("percolate_job_ad")
+def percolate_job_ad(job_ad_id: str) -> int:
+    """
+    Match a new ad against the saved searches and queue alerts for the
+    matches. Returns the number of alerts queued.
+    """
+    db = SessionLocal()
+    try:
+        sync_index(db)
+
+        job_ad = (
+            db.query(JobAd)
+            .options(undefer(JobAd.description))
+            .filter(JobAd.id == UUID(job_ad_id))
+            .first()
+        )
+        if job_ad is None:
+            return 0
+
+        matches = index.match(job_ad)
+        if not matches:
+            return 0
+
+        # The unique constraint makes retries of this task idempotent
+        db.execute(
+            insert(SearchAlert)
+            .values([
+                {"user_id": search.user_id, "saved_search_id": search.id, "job_ad_id": job_ad.id}
+                for search in matches
+            ])
+            .on_conflict_do_nothing(index_elements=["saved_search_id", "job_ad_id"])
+        )
+        db.commit()
+        return len(matches)
+    finally:
+        db.close()
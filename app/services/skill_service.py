@@ -0,0 +1,157 @@
+import csv
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercase and collapse whitespace, so "Machine  Learning" matches
+    "machine learning"
+    """
+    return " ".join(text.lower().split())
+
+
+def is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not text[index].isalnum()
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over every term (skills and their synonyms) in
+    the dictionary.
+
+    Scanning a text is one pass over its characters, however many terms
+    the dictionary has. Matches must start and end on word boundaries, so
+    "java" doesn't match inside "javascript", and overlapping matches are
+    resolved leftmost-longest ("react native" rather than "react").
+
+    The automaton is immutable once built, so one instance can be shared
+    by every thread, and by every worker forked from a preloaded master.
+    """
+
+    def __init__(self, terms: Dict[str, str]):
+        # terms maps each normalized term to its canonical skill name
+        self.skills: List[str] = sorted(set(terms.values()))
+        skill_ids = {skill: i for i, skill in enumerate(self.skills)}
+        self.canonical: Dict[str, str] = dict(terms)
+
+        # Trie: transitions per node, the failure link, and the
+        # (skill id, term length) pairs that end at the node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[Tuple[int, int], ...]] = [()]
+
+        for term, skill in terms.items():
+            node = 0
+            for char in term:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                node = next_node
+            self._output[node] = ((skill_ids[skill], len(term)),)
+
+        # Breadth-first so a node's failure link is set before its children's
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] += self._output[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self.canonical)
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Non-overlapping (start, end, skill) matches in a normalized text
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        candidates = []
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for skill_id, length in output[node]:
+                start = end - length
+                if is_boundary(text, start - 1) and is_boundary(text, end):
+                    candidates.append((start, end, skill_id))
+
+        matches = []
+        last_end = 0
+        for start, end, skill_id in sorted(candidates, key=lambda m: (m[0], m[0] - m[1])):
+            if start >= last_end:
+                matches.append((start, end, self.skills[skill_id]))
+                last_end = end
+        return matches
+
+    def extract(self, *texts: Optional[str]) -> List[str]:
+        """
+        Canonical skills mentioned in any of the texts, sorted
+        """
+        found = set()
+        for text in texts:
+            if text:
+                found.update(skill for _, _, skill in self.find(normalize(text)))
+        return sorted(found)
+
+
+def load_terms(path: Path) -> Dict[str, str]:
+    """
+    Read a skills CSV with the columns skill and synonyms (";"-separated)
+    """
+    terms = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            skill = normalize(row["skill"])
+            if not skill:
+                continue
+            terms[skill] = skill
+            for synonym in (row.get("synonyms") or "").split(";"):
+                synonym = normalize(synonym)
+                if synonym:
+                    terms.setdefault(synonym, skill)
+    return terms
+
+
+@lru_cache(maxsize=1)
+def load_skill_matcher() -> SkillMatcher:
+    """
+    The matcher for SKILLS_DICTIONARY_PATH, built once per process.
+
+    run.py builds it in the master before forking so production workers
+    share it instead of each compiling their own.
+    """
+    return SkillMatcher(load_terms(Path(settings.SKILLS_DICTIONARY_PATH)))
+
+
+def canonical_keyword(keyword: str) -> str:
+    """
+    A keyword as stored on job ads: normalized, and mapped to its canonical
+    skill name when the dictionary knows it
+    """
+    keyword = normalize(keyword)
+    return load_skill_matcher().canonical.get(keyword, keyword)
+
+
+def extract_keywords(*texts: Optional[str], extra: Iterable[str] = ()) -> List[str]:
+    """
+    Skills found in the texts, plus any `extra` keywords given by hand
+    (mapped to their canonical skill name when the dictionary knows them)
+    """
+    keywords = set(load_skill_matcher().extract(*texts))
+    keywords.update(filter(None, (canonical_keyword(keyword) for keyword in extra)))
+    return sorted(keywords)
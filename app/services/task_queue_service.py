@@ -0,0 +1,238 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.tasks import BackgroundTask, TaskStatus
+
+# Registered task handlers, by task name
+TASK_HANDLERS: Dict[str, Callable] = {}
+
+# Jobs every worker process runs on a fixed interval: name -> (seconds, function)
+PERIODIC_TASKS: Dict[str, Tuple[float, Callable]] = {}
+
+
+def task(name: str):
+    """
+    Register a function as the handler for a background task.
+
+    Handlers receive the task payload as keyword arguments and may be
+    plain functions (run in a thread) or coroutines.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        TASK_HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def periodic(name: str, interval_seconds: float):
+    """
+    Register a function the worker calls every `interval_seconds`.
+
+    Every worker process runs these, so they must be safe to run
+    concurrently (e.g. claim their rows with SKIP LOCKED).
+    """
+
+    def decorator(func: Callable) -> Callable:
+        PERIODIC_TASKS[name] = (interval_seconds, func)
+        return func
+
+    return decorator
+
+
+def enqueue_task(
+    db: Session,
+    name: str,
+    payload: Optional[Dict[str, Any]] = None,
+    queue: str = "default",
+    priority: int = 0,
+    delay_seconds: int = 0,
+    max_attempts: int = 5,
+    commit: bool = True,
+) -> BackgroundTask:
+    """
+    Add a task to the queue.
+
+    With commit=False the task is only added to the session, so it becomes
+    visible to workers atomically with the caller's own transaction.
+    """
+    background_task = BackgroundTask(
+        queue=queue,
+        name=name,
+        payload=payload or {},
+        status=TaskStatus.QUEUED,
+        priority=priority,
+        max_attempts=max_attempts,
+        run_at=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds),
+    )
+    db.add(background_task)
+    if commit:
+        db.commit()
+    return background_task
+
+
+def claim_tasks(
+    db: Session, queue: str, worker_id: str, limit: int
+) -> List[BackgroundTask]:
+    """
+    Claim up to `limit` ready tasks from a queue.
+
+    Rows locked by other workers are skipped rather than waited on, so any
+    number of workers can poll the same queue without contention.
+    """
+    ready = (
+        select(BackgroundTask.id)
+        .where(
+            BackgroundTask.queue == queue,
+            BackgroundTask.status == TaskStatus.QUEUED,
+            BackgroundTask.run_at <= datetime.now(timezone.utc),
+        )
+        .order_by(BackgroundTask.priority.desc(), BackgroundTask.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = db.execute(
+        update(BackgroundTask)
+        .where(BackgroundTask.id.in_(ready.scalar_subquery()))
+        .values(
+            status=TaskStatus.RUNNING,
+            locked_at=datetime.now(timezone.utc),
+            locked_by=worker_id,
+            attempts=BackgroundTask.attempts + 1,
+        )
+        .returning(BackgroundTask),
+        execution_options={"synchronize_session": False},
+    ).scalars().all()
+    # Detach before committing so the claimed rows stay readable after the
+    # session is closed
+    for background_task in claimed:
+        db.expunge(background_task)
+    db.commit()
+    return list(claimed)
+
+
+def complete_task(db: Session, task_id: int) -> None:
+    """
+    Mark a task as done
+    """
+    db.execute(
+        update(BackgroundTask)
+        .where(BackgroundTask.id == task_id)
+        .values(status=TaskStatus.DONE, locked_at=None, locked_by=None, last_error=None)
+    )
+    db.commit()
+
+
+def get_retry_delay(attempts: int) -> float:
+    """
+    Exponential backoff with jitter for the given number of attempts
+    """
+    delay = min(
+        settings.TASK_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0),
+        settings.TASK_RETRY_MAX_SECONDS,
+    )
+    return delay * random.uniform(0.8, 1.2)
+
+
+def fail_task(db: Session, task_id: int, error: str) -> str:
+    """
+    Record a failed attempt.
+
+    The task is rescheduled with backoff, or moved to the dead-letter state
+    once it has used up its attempts. Returns the new status.
+    """
+    background_task = db.get(BackgroundTask, task_id)
+    if background_task is None:
+        return TaskStatus.DEAD
+
+    background_task.last_error = error
+    background_task.locked_at = None
+    background_task.locked_by = None
+    if background_task.attempts >= background_task.max_attempts:
+        background_task.status = TaskStatus.DEAD
+    else:
+        background_task.status = TaskStatus.QUEUED
+        background_task.run_at = datetime.now(timezone.utc) + timedelta(
+            seconds=get_retry_delay(background_task.attempts)
+        )
+    status = background_task.status
+    db.commit()
+    return status
+
+
+def heartbeat_tasks(db: Session, task_ids: List[int], worker_id: str) -> int:
+    """
+    Refresh the lock of tasks this worker is still running, so long-running
+    handlers aren't mistaken for orphans and run a second time
+    """
+    if not task_ids:
+        return 0
+    result = db.execute(
+        update(BackgroundTask)
+        .where(
+            BackgroundTask.id.in_(task_ids),
+            BackgroundTask.status == TaskStatus.RUNNING,
+            BackgroundTask.locked_by == worker_id,
+        )
+        .values(locked_at=datetime.now(timezone.utc)),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return result.rowcount
+
+
+def requeue_stale_tasks(db: Session) -> Tuple[int, int]:
+    """
+    Recover tasks whose worker died while running them (their lock stopped
+    being refreshed).
+
+    Tasks with attempts left go back on the queue; tasks that have used
+    them all, e.g. because they keep crashing their worker, are moved to
+    the dead-letter state. Returns (requeued, dead).
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.TASK_LOCK_TIMEOUT_SECONDS
+    )
+    stale = (
+        BackgroundTask.status == TaskStatus.RUNNING,
+        BackgroundTask.locked_at < cutoff,
+    )
+    dead = db.execute(
+        update(BackgroundTask)
+        .where(*stale, BackgroundTask.attempts >= BackgroundTask.max_attempts)
+        .values(
+            status=TaskStatus.DEAD,
+            locked_at=None,
+            locked_by=None,
+            last_error="Worker stopped while running the task (lock expired)",
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    requeued = db.execute(
+        update(BackgroundTask)
+        .where(*stale)
+        .values(status=TaskStatus.QUEUED, locked_at=None, locked_by=None),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return requeued.rowcount, dead.rowcount
+
+
+def retry_dead_task(db: Session, task_id: int) -> Optional[BackgroundTask]:
+    """
+    Move a dead-lettered task back to the queue with a fresh set of attempts
+    """
+    background_task = db.get(BackgroundTask, task_id)
+    if background_task is None or background_task.status != TaskStatus.DEAD:
+        return None
+
+    background_task.status = TaskStatus.QUEUED
+    background_task.attempts = 0
+    background_task.run_at = datetime.now(timezone.utc)
+    db.commit()
+    return background_task
@@ -0,0 +1,224 @@
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request as GoogleRequest
+from google.oauth2.credentials import Credentials
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.security import decrypt_secret, encrypt_secret
+from app.models.credentials import OAuthCredential
+from app.services.task_queue_service import periodic
+
+GOOGLE_PROVIDER = "google"
+GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+# Cached tokens are handed out only while they have at least this much life
+# left; the refresh-ahead window is wider, so the stored token is normally
+# renewed before any cache entry runs out.
+MIN_TOKEN_TTL = timedelta(seconds=60)
+
+logger = logging.getLogger(__name__)
+
+# Decrypted access tokens per user: user_id -> (token, expires_at)
+_access_tokens: Dict[UUID, Tuple[str, datetime]] = {}
+_access_tokens_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_google_client_config() -> Tuple[Optional[str], Optional[str]]:
+    """
+    Google OAuth client id and secret, from settings or the client secret file
+    """
+    if settings.GOOGLE_CLIENT_ID and settings.GOOGLE_CLIENT_SECRET:
+        return settings.GOOGLE_CLIENT_ID, settings.GOOGLE_CLIENT_SECRET
+
+    if settings.CLIENT_SECRET_PATH and Path(settings.CLIENT_SECRET_PATH).exists():
+        data = json.loads(Path(settings.CLIENT_SECRET_PATH).read_text())
+        client = data.get("web") or data.get("installed") or {}
+        return client.get("client_id"), client.get("client_secret")
+
+    return None, None
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # google-auth reports expiry as a naive UTC datetime
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _cache_access_token(user_id: UUID, token: str, expires_at: Optional[datetime]):
+    if expires_at is None:
+        return
+    with _access_tokens_lock:
+        _access_tokens[user_id] = (token, expires_at)
+
+
+def get_credential(db: Session, user_id: UUID, provider: str = GOOGLE_PROVIDER) -> Optional[OAuthCredential]:
+    return (
+        db.query(OAuthCredential)
+        .filter(OAuthCredential.user_id == user_id, OAuthCredential.provider == provider)
+        .first()
+    )
+
+
+def store_google_credentials(db: Session, user_id: UUID, credentials: Credentials) -> OAuthCredential:
+    """
+    Encrypt and store the credentials returned by the OAuth flow.
+
+    Google only sends a refresh token on first consent, so an existing one
+    is kept when the new credentials don't include it.
+    """
+    credential = get_credential(db, user_id)
+    if credential is None:
+        credential = OAuthCredential(user_id=user_id, provider=GOOGLE_PROVIDER)
+        db.add(credential)
+
+    if credentials.refresh_token:
+        credential.encrypted_refresh_token = encrypt_secret(credentials.refresh_token)
+    if credentials.token:
+        credential.encrypted_access_token = encrypt_secret(credentials.token)
+    expires_at = _as_utc(credentials.expiry)
+    credential.access_token_expires_at = expires_at
+    if credentials.scopes:
+        credential.scopes = " ".join(credentials.scopes)
+
+    db.commit()
+    if credentials.token:
+        _cache_access_token(user_id, credentials.token, expires_at)
+    return credential
+
+
+def refresh_credential(db: Session, credential: OAuthCredential) -> Optional[str]:
+    """
+    Exchange the stored refresh token for a new access token and store it.
+
+    The caller owns the transaction and must commit.
+    """
+    if not credential.encrypted_refresh_token:
+        return None
+
+    client_id, client_secret = get_google_client_config()
+    credentials = Credentials(
+        token=None,
+        refresh_token=decrypt_secret(credential.encrypted_refresh_token),
+        token_uri=GOOGLE_TOKEN_URI,
+        client_id=client_id,
+        client_secret=client_secret,
+        scopes=credential.scopes.split() if credential.scopes else None,
+    )
+    credentials.refresh(GoogleRequest())
+
+    credential.encrypted_access_token = encrypt_secret(credentials.token)
+    credential.access_token_expires_at = _as_utc(credentials.expiry)
+    if credentials.refresh_token:
+        credential.encrypted_refresh_token = encrypt_secret(credentials.refresh_token)
+    return credentials.token
+
+
+def get_google_access_token(db: Session, user_id: UUID) -> Optional[str]:
+    """
+    Get a valid Google access token for a user.
+
+    Served from the in-process cache when possible, otherwise from the
+    vault. A synchronous refresh only happens if the background refresh
+    has fallen behind.
+    """
+    now = datetime.now(timezone.utc)
+    with _access_tokens_lock:
+        cached = _access_tokens.get(user_id)
+    if cached and cached[1] - now > MIN_TOKEN_TTL:
+        return cached[0]
+
+    credential = get_credential(db, user_id)
+    if credential is None:
+        return None
+
+    expires_at = credential.access_token_expires_at
+    if credential.encrypted_access_token and expires_at and expires_at - now > MIN_TOKEN_TTL:
+        token = decrypt_secret(credential.encrypted_access_token)
+    else:
+        logger.info(f"Refreshing Google token for user {user_id} on the request path")
+        token = refresh_credential(db, credential)
+        expires_at = credential.access_token_expires_at
+        db.commit()
+
+    if token:
+        _cache_access_token(user_id, token, expires_at)
+    return token
+
+
+def delete_credentials(db: Session, user_id: UUID) -> None:
+    credential = get_credential(db, user_id)
+    if credential is not None:
+        db.delete(credential)
+        db.commit()
+    with _access_tokens_lock:
+        _access_tokens.pop(user_id, None)
+
+
+@periodic("refresh_google_tokens", settings.GOOGLE_TOKEN_REFRESH_INTERVAL_SECONDS)
+def refresh_expiring_tokens(batch_size: int = 100) -> int:
+    """
+    Refresh-ahead: renew access tokens that expire within the refresh window.
+
+    Credentials are claimed one at a time with SKIP LOCKED, so several
+    workers never refresh the same token twice, and each one is committed
+    right after its refresh call; no row stays locked while the others
+    are being refreshed.
+    """
+    refreshed = 0
+    attempted = []
+    cutoff = datetime.now(timezone.utc) + timedelta(
+        seconds=settings.GOOGLE_TOKEN_REFRESH_AHEAD_SECONDS
+    )
+    db = SessionLocal()
+    try:
+        while len(attempted) < batch_size:
+            query = (
+                select(OAuthCredential)
+                .where(
+                    OAuthCredential.provider == GOOGLE_PROVIDER,
+                    OAuthCredential.encrypted_refresh_token.is_not(None),
+                    OAuthCredential.access_token_expires_at < cutoff,
+                )
+                .order_by(OAuthCredential.access_token_expires_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            if attempted:
+                # Failed ones stay expiring; don't pick them again this run
+                query = query.where(OAuthCredential.id.not_in(attempted))
+            credential = db.execute(query).scalars().first()
+            if credential is None:
+                break
+
+            attempted.append(credential.id)
+            user_id = credential.user_id
+            try:
+                refresh_credential(db, credential)
+                refreshed += 1
+            except RefreshError as e:
+                # The grant was revoked or expired; drop it so the user is
+                # asked to reconnect instead of retrying forever
+                logger.warning(f"Google refresh token for user {user_id} rejected: {str(e)}")
+                credential.encrypted_refresh_token = None
+            except Exception as e:
+                logger.error(f"Error refreshing Google token for user {user_id}: {str(e)}")
+            db.commit()
+    finally:
+        db.close()
+
+    if refreshed:
+        logger.info(f"Refreshed {refreshed} Google access tokens")
+    return refreshed
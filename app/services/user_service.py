@@ -2,9 +2,20 @@ from typing import Optional, List
 from sqlalchemy.orm import Session
 from uuid import UUID
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.notify import listener, notify
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+USER_INVALIDATION_CHANNEL = "user_invalidate"
+
+# Column values of recently loaded users, by id
+_user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
@@ -14,6 +25,54 @@ def get_user_by_id(db: Session, user_id: UUID) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
 
 
+def get_user_by_id_cached(user_id: UUID) -> Optional[User]:
+    """
+    Get a user through the in-process cache.
+
+    Returns a detached copy that is safe to share between requests. It is
+    meant for reading (e.g. authentication); load the user with
+    get_user_by_id before modifying it.
+
+    Misses are read from the primary, never a replica: a lagging replica
+    could hand back a row from before the last invalidation, which would
+    then be served until it expires.
+    """
+    data = _user_cache.get(user_id)
+    if data is None:
+        epoch = _user_cache.epoch()
+        db = SessionLocal()
+        try:
+            user = get_user_by_id(db, user_id)
+            if user is None:
+                return None
+            data = {column.key: getattr(user, column.key) for column in User.__table__.columns}
+        finally:
+            db.close()
+        _user_cache.set(user_id, data, epoch=epoch)
+    return User(**data)
+
+
+def invalidate_cached_user(user_id: str):
+    try:
+        _user_cache.invalidate(UUID(str(user_id)))
+    except ValueError:
+        pass
+
+
+def publish_user_invalidation(db: Session, user: User):
+    """
+    Drop the user from this worker's cache and tell the other workers to
+    do the same once the transaction commits
+    """
+    invalidate_cached_user(user.id)
+    notify(db, USER_INVALIDATION_CHANNEL, str(user.id))
+
+
+listener.subscribe(USER_INVALIDATION_CHANNEL, invalidate_cached_user)
+# Invalidations sent while the listener was disconnected are lost
+listener.on_reconnect(_user_cache.clear)
+
+
 def get_user_by_google_id(db: Session, google_id: str) -> Optional[User]:
     return db.query(User).filter(User.google_id == google_id).first()
 
@@ -31,6 +90,8 @@ def create_user(db: Session, user_in: UserCreate) -> User:
         is_superuser=False,
     )
     db.add(user)
+    db.flush()
+    publish_user_invalidation(db, user)
     db.commit()
     db.refresh(user)
     return user
@@ -43,6 +104,7 @@ def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
         setattr(user, field, value)
 
     db.add(user)
+    publish_user_invalidation(db, user)
     db.commit()
     db.refresh(user)
     return user
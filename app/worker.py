@@ -0,0 +1,218 @@
+"""
+Background task worker.
+
+Run with `python -m app.worker`. One process serves every queue listed in
+TASK_QUEUES, running up to the configured number of tasks per queue
+concurrently on a single event loop.
+"""
+import asyncio
+import importlib
+import inspect
+import logging
+import os
+import signal
+import socket
+import traceback
+from typing import Callable, Dict, Set
+
+from app.core.config import parse_task_queues, settings
+
+# Must be set before app.core.db is imported so the pool is sized for a
+# non-web process
+settings.PROCESS_ROLE = "worker"
+
+from app.core.db import SessionLocal, get_pool_limits
+from app.core.notify import listener
+from app.models.tasks import BackgroundTask, TaskStatus
+from app.services.task_queue_service import (
+    PERIODIC_TASKS,
+    TASK_HANDLERS,
+    claim_tasks,
+    complete_task,
+    fail_task,
+    heartbeat_tasks,
+    requeue_stale_tasks,
+)
+
+# Modules that register @task or @periodic handlers, imported when the worker starts
+TASK_MODULES: list[str] = [
+    "app.services.token_vault_service",
+    "app.services.job_ad_partition_service",
+    "app.services.saved_search_service",
+]
+
+# How often orphaned running tasks are looked for
+STALE_CHECK_INTERVAL = 60
+
+logger = logging.getLogger(__name__)
+
+
+def run_in_session(func: Callable, *args):
+    """
+    Call func(db, *args) with a short-lived session
+    """
+    db = SessionLocal()
+    try:
+        return func(db, *args)
+    finally:
+        db.close()
+
+
+class Worker:
+    def __init__(self, queues: Dict[str, int]):
+        self.queues = queues
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = asyncio.Event()
+        self.active: Set[asyncio.Task] = set()
+        # Ids of the tasks currently running, for the lock heartbeat
+        self.running_ids: Set[int] = set()
+
+    async def db_call(self, func: Callable, *args):
+        return await asyncio.to_thread(run_in_session, func, *args)
+
+    async def sleep(self, seconds: float):
+        """
+        Sleep, but wake up early when the worker is asked to stop
+        """
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def execute(self, background_task: BackgroundTask):
+        self.running_ids.add(background_task.id)
+        try:
+            handler = TASK_HANDLERS.get(background_task.name)
+            if handler is None:
+                raise LookupError(f"No handler registered for task {background_task.name}")
+
+            if inspect.iscoroutinefunction(handler):
+                await handler(**background_task.payload)
+            else:
+                await asyncio.to_thread(handler, **background_task.payload)
+        except Exception as e:
+            error = "".join(traceback.format_exception(e))
+            status = await self.db_call(fail_task, background_task.id, error)
+            if status == TaskStatus.DEAD:
+                logger.error(f"Task {background_task.id} ({background_task.name}) moved to dead letter: {e}")
+            else:
+                logger.warning(f"Task {background_task.id} ({background_task.name}) failed, will retry: {e}")
+        else:
+            await self.db_call(complete_task, background_task.id)
+        finally:
+            self.running_ids.discard(background_task.id)
+
+    async def consume(self, queue: str, concurrency: int):
+        """
+        Keep up to `concurrency` tasks from one queue running
+        """
+        running: Set[asyncio.Task] = set()
+
+        while not self.stopping.is_set():
+            free = concurrency - len(running)
+            if free <= 0:
+                await asyncio.wait(
+                    running,
+                    timeout=settings.TASK_POLL_INTERVAL,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                continue
+
+            try:
+                claimed = await self.db_call(claim_tasks, queue, self.worker_id, free)
+            except Exception as e:
+                logger.error(f"Error claiming tasks from queue {queue}: {str(e)}")
+                await self.sleep(settings.TASK_POLL_INTERVAL)
+                continue
+
+            for background_task in claimed:
+                job = asyncio.create_task(self.execute(background_task))
+                running.add(job)
+                self.active.add(job)
+                job.add_done_callback(running.discard)
+                job.add_done_callback(self.active.discard)
+
+            # A full batch means there is probably more work waiting
+            if len(claimed) < free:
+                await self.sleep(settings.TASK_POLL_INTERVAL)
+
+    async def heartbeat(self):
+        """
+        Keep the locks of running tasks fresh, also while stopping
+        """
+        while not self.stopping.is_set() or self.active:
+            try:
+                await self.db_call(heartbeat_tasks, list(self.running_ids), self.worker_id)
+            except Exception as e:
+                logger.error(f"Error refreshing task locks: {str(e)}")
+            await asyncio.sleep(settings.TASK_LOCK_TIMEOUT_SECONDS / 3)
+
+    async def reap_stale_tasks(self):
+        while not self.stopping.is_set():
+            try:
+                requeued, dead = await self.db_call(requeue_stale_tasks)
+                if requeued:
+                    logger.warning(f"Requeued {requeued} orphaned tasks")
+                if dead:
+                    logger.error(f"Moved {dead} orphaned tasks without attempts left to dead letter")
+            except Exception as e:
+                logger.error(f"Error requeueing stale tasks: {str(e)}")
+            await self.sleep(STALE_CHECK_INTERVAL)
+
+    async def run_periodic(self, name: str, interval: float, func: Callable):
+        while not self.stopping.is_set():
+            try:
+                if inspect.iscoroutinefunction(func):
+                    await func()
+                else:
+                    await asyncio.to_thread(func)
+            except Exception as e:
+                logger.error(f"Error in periodic task {name}: {str(e)}")
+            await self.sleep(interval)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.stopping.set)
+
+        logger.info(f"Worker {self.worker_id} consuming queues {self.queues}")
+        consumers = [
+            asyncio.create_task(self.consume(queue, concurrency))
+            for queue, concurrency in self.queues.items()
+        ]
+        consumers.append(asyncio.create_task(self.reap_stale_tasks()))
+        heartbeat = asyncio.create_task(self.heartbeat())
+        consumers.extend(
+            asyncio.create_task(self.run_periodic(name, interval, func))
+            for name, (interval, func) in PERIODIC_TASKS.items()
+        )
+        await asyncio.gather(*consumers)
+
+        # Let running tasks finish; anything still running after the grace
+        # period is picked up again by the stale task reaper
+        if self.active:
+            logger.info(f"Waiting for {len(self.active)} running tasks")
+            await asyncio.wait(self.active, timeout=settings.WORKER_GRACEFUL_TIMEOUT)
+        heartbeat.cancel()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    for module in TASK_MODULES:
+        importlib.import_module(module)
+    # Pool plus the LISTEN connection
+    connections = sum(get_pool_limits()) + 1
+    if connections > settings.DB_RESERVED_CONNECTIONS:
+        logger.warning(
+            f"The worker may open {connections} connections, more than "
+            f"DB_RESERVED_CONNECTIONS ({settings.DB_RESERVED_CONNECTIONS})"
+        )
+    listener.start()
+    try:
+        asyncio.run(Worker(parse_task_queues(settings.TASK_QUEUES)).run())
+    finally:
+        listener.stop()
+
+
+if __name__ == "__main__":
+    main()
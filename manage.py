@@ -0,0 +1,140 @@
+import argparse
+import json
+import logging
+
+from app.core.config import settings
+
+# Must be set before app.core.db is imported so the pool is sized for a
+# non-web process
+settings.PROCESS_ROLE = "manage"
+
+from app.core.db import SessionLocal, engine
+from app.schemas.job_ad import JobAdCreate
+from app.services.geo_service import backfill_coordinates
+from app.services.job_ad_partition_service import (
+    archive_old_partitions,
+    create_partitioned_index,
+    drop_partitioned_index,
+    ensure_partitions,
+    list_partitions,
+)
+from app.services.job_registry_service import import_job_ads, refresh_keywords
+
+
+def autocommit_connection():
+    return engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+
+def ensure_partitions_command(args):
+    with autocommit_connection() as conn:
+        for name in ensure_partitions(conn, months_ahead=args.months_ahead):
+            print(name)
+
+
+def list_partitions_command(args):
+    with autocommit_connection() as conn:
+        for name in list_partitions(conn):
+            print(name)
+
+
+def archive_partitions_command(args):
+    with autocommit_connection() as conn:
+        for path in archive_old_partitions(
+            conn, retention_months=args.retention_months, archive_dir=args.archive_dir
+        ):
+            print(path)
+
+
+def create_index_command(args):
+    with autocommit_connection() as conn:
+        create_partitioned_index(
+            conn, args.name, args.columns, using=args.using, include=args.include
+        )
+
+
+def drop_index_command(args):
+    with autocommit_connection() as conn:
+        drop_partitioned_index(conn, args.name)
+
+
+def geocode_job_ads_command(args):
+    db = SessionLocal()
+    try:
+        print(f"Geocoded {backfill_coordinates(db, batch_size=args.batch_size)} job ads")
+    finally:
+        db.close()
+
+
+def import_job_ads_command(args):
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8") as f:
+            job_ads = (JobAdCreate.model_validate(json.loads(line)) for line in f if line.strip())
+            print(f"Imported {import_job_ads(db, job_ads, batch_size=args.batch_size)} job ads")
+    finally:
+        db.close()
+
+
+def extract_keywords_command(args):
+    db = SessionLocal()
+    try:
+        print(f"Updated keywords of {refresh_keywords(db, batch_size=args.batch_size)} job ads")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="CareerDock management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ensure = commands.add_parser(
+        "ensure-partitions", help="Create job_ads partitions for the coming months"
+    )
+    ensure.add_argument("--months-ahead", type=int, default=None)
+    ensure.set_defaults(func=ensure_partitions_command)
+
+    listing = commands.add_parser("list-partitions", help="List job_ads partitions")
+    listing.set_defaults(func=list_partitions_command)
+
+    archive = commands.add_parser(
+        "archive-partitions", help="Detach old job_ads partitions into gzipped CSV files"
+    )
+    archive.add_argument("--retention-months", type=int, default=None)
+    archive.add_argument("--archive-dir", default=None)
+    archive.set_defaults(func=archive_partitions_command)
+
+    create_index = commands.add_parser(
+        "create-index", help="Build an index on job_ads concurrently, partition by partition"
+    )
+    create_index.add_argument("name")
+    create_index.add_argument("columns", help='Column list, e.g. "company, date_posted"')
+    create_index.add_argument("--using", default=None, help="Index method, e.g. gin")
+    create_index.add_argument("--include", default=None, help="Covering columns")
+    create_index.set_defaults(func=create_index_command)
+
+    drop_index = commands.add_parser("drop-index", help="Drop a job_ads index")
+    drop_index.add_argument("name")
+    drop_index.set_defaults(func=drop_index_command)
+
+    geocode = commands.add_parser(
+        "geocode-job-ads", help="Fill in coordinates for job ads stored without them"
+    )
+    geocode.add_argument("--batch-size", type=int, default=1000)
+    geocode.set_defaults(func=geocode_job_ads_command)
+
+    importer = commands.add_parser(
+        "import-job-ads", help="Import job ads from a JSON lines file"
+    )
+    importer.add_argument("path")
+    importer.add_argument("--batch-size", type=int, default=500)
+    importer.set_defaults(func=import_job_ads_command)
+
+    keywords = commands.add_parser(
+        "extract-keywords", help="Run skill extraction over the stored job ads"
+    )
+    keywords.add_argument("--batch-size", type=int, default=1000)
+    keywords.set_defaults(func=extract_keywords_command)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -1,4 +1,107 @@
+import argparse
+import gc
+import multiprocessing
+import os
+
 import uvicorn
 
+from app.core.config import settings
+
+
+def get_worker_count() -> int:
+    """
+    Number of web workers for production mode.
+
+    Uses WEB_CONCURRENCY when set, otherwise (2 x CPU) + 1, capped by
+    WEB_MAX_WORKERS and by how many workers the DB connection budget can
+    give at least two pooled connections plus the LISTEN connection each.
+    """
+    if settings.WEB_CONCURRENCY:
+        return settings.WEB_CONCURRENCY
+
+    workers = multiprocessing.cpu_count() * 2 + 1
+    budget = settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS
+    return max(1, min(workers, settings.WEB_MAX_WORKERS, budget // 3))
+
+
+def run_production(host: str, port: int, workers: int):
+    """
+    Serve the app with gunicorn managing uvicorn workers
+    """
+    from gunicorn.app.base import BaseApplication
+
+    # Must be set before the app (and app.core.db) is imported so the
+    # per-worker pool is sized from the number of workers.
+    settings.WEB_CONCURRENCY = workers
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+    def post_fork(server, worker):
+        # Connections opened in the master during preload must not be
+        # shared with the children; drop them without closing the sockets.
+        from app.core.db import dispose_engines
+
+        dispose_engines(close=False)
+
+    class CareerDockApplication(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            from app.services.geo_service import load_gazetteer
+            from app.services.skill_service import load_skill_matcher
+
+            # Build the read-only lookup structures once, here in the master
+            load_gazetteer()
+            load_skill_matcher()
+            # Keep the collector from touching (and so copying) the
+            # preloaded objects in every worker
+            gc.freeze()
+            return app
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        # Import the app once in the master so workers share it copy-on-write
+        "preload_app": True,
+        "post_fork": post_fork,
+        # Recycle workers to bound memory growth
+        "max_requests": settings.WORKER_MAX_REQUESTS,
+        "max_requests_jitter": settings.WORKER_MAX_REQUESTS_JITTER,
+        # On SIGTERM, stop accepting and let in-flight requests finish
+        "graceful_timeout": settings.WORKER_GRACEFUL_TIMEOUT,
+        "timeout": settings.WORKER_TIMEOUT,
+        "accesslog": "-",
+    }
+    CareerDockApplication(options).run()
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the CareerDock web server")
+    parser.add_argument(
+        "--prod", action="store_true", help="Run with multiple preloaded workers"
+    )
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.prod:
+        run_production(
+            host=args.host or settings.WEB_HOST,
+            port=args.port or settings.WEB_PORT,
+            workers=args.workers or get_worker_count(),
+        )
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host or "127.0.0.1",
+            port=args.port or 8000,
+            reload=True,
+        )